@@ -1,8 +1,24 @@
+import sys
 import math
+import mmap
+import json
+import struct
+import time
 import random
+import heapq
+import bisect
+from collections import deque
 import argparse
+from array import array
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from copy import deepcopy
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 DEBUG = False
 
@@ -12,23 +28,118 @@ def debug_print(*args, **kwargs):
         print(*args, **kwargs)
 
 
-def generate_matrix(n, symmetric=True, max_weight=100):
+def is_ndarray(matrix):
+    return np is not None and isinstance(matrix, np.ndarray)
+
+
+def to_ndarray(matrix, dtype=None):
+    """
+    Переводит матрицу в непрерывный массив NumPy (int32 для целых весов, иначе float64).
+    """
+    if np is None:
+        raise RuntimeError("Для numpy-режима требуется установленный пакет numpy")
+    if dtype is None:
+        integral = all(isinstance(w, int) for row in matrix for w in row)
+        dtype = np.int32 if integral else np.float64
+    return np.ascontiguousarray(np.asarray(matrix, dtype=dtype))
+
+
+def to_list(matrix):
+    """
+    Возвращает матрицу в виде, удобном для скалярных циклов: список списков,
+    а для numpy.memmap – построчный доступ без материализации (ArrayRows).
+    """
+    if not is_ndarray(matrix):
+        return matrix
+    if isinstance(matrix, np.memmap) and matrix.dtype.isnative:
+        return ArrayRows(matrix)
+    return matrix.tolist()
+
+
+class ArrayRows:
+    """
+    Строки двумерного массива NumPy (например, numpy.memmap) как memoryview:
+    matrix[i][j] возвращает число Python, данные не копируются – как у MappedMatrix.
+    """
+
+    def __init__(self, matrix):
+        n = len(matrix)
+        native = np.ascontiguousarray(matrix).view(matrix.dtype.newbyteorder('='))
+        data = memoryview(native).cast('B').cast(matrix.dtype.char)
+        self._rows = [data[i * n:(i + 1) * n] for i in range(n)]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        return self._rows[i]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+def generate_matrix(n, symmetric=True, max_weight=100, backend="list"):
     """
     Генерирует матрицу весов для полного графа с n вершинами.
     Если symmetric=True, матрица делается симметричной.
+    При backend="numpy" возвращается массив NumPy с теми же значениями.
     """
     matrix = [[0 if i == j else random.randint(1, max_weight) for j in range(n)] for i in range(n)]
     if symmetric:
         for i in range(n):
             for j in range(i + 1, n):
                 matrix[j][i] = matrix[i][j]
+    if backend == "numpy":
+        return to_ndarray(matrix)
     return matrix
 
 
-def save_matrix(matrix, filename):
+BINARY_MAGIC = b"TSPM"
+# Заголовок: сигнатура, тип элементов (код array), флаг симметричности, выравнивание, n
+BINARY_HEADER = struct.Struct("<4sBBxxQ")
+
+
+def _matrix_typecode(matrix):
+    if is_ndarray(matrix):
+        if np.issubdtype(matrix.dtype, np.integer):
+            return 'i'
+        return 'f' if matrix.dtype == np.float32 else 'd'
+    if all(isinstance(w, int) and -2 ** 31 <= w < 2 ** 31 for row in matrix for w in row):
+        return 'i'
+    return 'd'
+
+
+def _is_symmetric(matrix):
+    n = len(matrix)
+    return all(matrix[i][j] == matrix[j][i] for i in range(n) for j in range(i + 1, n))
+
+
+def _triangle_offset(n, i):
+    # Начало строки i в верхнем треугольнике (с диагональю), записанном по строкам
+    return i * n - i * (i - 1) // 2
+
+
+def save_matrix(matrix, filename, binary=False, symmetric=None):
     """
     Сохраняет матрицу в файл.
+    При binary=True пишется двоичный формат: заголовок BINARY_HEADER и значения по строкам;
+    для симметричной матрицы (symmetric=None – определить автоматически) хранится только верхний треугольник.
     """
+    if binary:
+        n = len(matrix)
+        typecode = _matrix_typecode(matrix)
+        if symmetric is None:
+            symmetric = _is_symmetric(matrix)
+        data = array(typecode)
+        for i in range(n):
+            row = [matrix[i][j] for j in range(i if symmetric else 0, n)]
+            data.extend(map(int, row) if typecode == 'i' else map(float, row))
+        if sys.byteorder != 'little':
+            data.byteswap()
+        with open(filename, 'wb') as f:
+            f.write(BINARY_HEADER.pack(BINARY_MAGIC, ord(typecode), int(symmetric), n))
+            data.tofile(f)
+        return
     with open(filename, 'w') as f:
         n = len(matrix)
         f.write(str(n) + "\n")
@@ -36,16 +147,133 @@ def save_matrix(matrix, filename):
             f.write(" ".join(map(str, row)) + "\n")
 
 
-def load_matrix(filename):
+def _read_header(header):
+    magic, typecode, symmetric, n = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC:
+        raise ValueError("Файл не является двоичной матрицей")
+    return chr(typecode), bool(symmetric), n
+
+
+def is_binary_matrix_file(filename):
+    with open(filename, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+class _TriangularRow:
     """
-    Загружает матрицу из файла.
+    Строка симметричной матрицы, хранящейся верхним треугольником.
     """
+
+    def __init__(self, data, n, i):
+        self.data = data
+        self.n = n
+        self.i = i
+        self.offset = _triangle_offset(n, i) - i
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, j):
+        if j >= self.i:
+            return self.data[self.offset + j]
+        return self.data[_triangle_offset(self.n, j) - j + self.i]
+
+    def __iter__(self):
+        return (self[j] for j in range(self.n))
+
+
+class MappedMatrix:
+    """
+    Матрица весов из двоичного файла, отображённого в память (mmap).
+    Значения читаются по требованию через matrix[i][j], вся матрица не материализуется.
+    """
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        typecode, self.symmetric, self.n = _read_header(self._mm[:BINARY_HEADER.size])
+        n = self.n
+        self._data = memoryview(self._mm)[BINARY_HEADER.size:].cast(typecode)
+        if self.symmetric:
+            self._rows = [_TriangularRow(self._data, n, i) for i in range(n)]
+        else:
+            self._rows = [self._data[i * n:(i + 1) * n] for i in range(n)]
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return self._rows[i]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+def _load_binary_matrix(filename, backend, use_mmap):
+    if use_mmap:
+        if backend == "numpy":
+            with open(filename, 'rb') as f:
+                typecode, symmetric, n = _read_header(f.read(BINARY_HEADER.size))
+            if not symmetric:
+                return np.memmap(filename, dtype=np.dtype(typecode).newbyteorder('<'), mode='r',
+                                 offset=BINARY_HEADER.size, shape=(n, n))
+        return MappedMatrix(filename)
+
+    if backend == "numpy":
+        return _load_binary_ndarray(filename)
+    with open(filename, 'rb') as f:
+        typecode, symmetric, n = _read_header(f.read(BINARY_HEADER.size))
+        data = array(typecode)
+        data.frombytes(f.read())
+    if sys.byteorder != 'little':
+        data.byteswap()
+    if symmetric:
+        matrix = [[0] * n for _ in range(n)]
+        for i in range(n):
+            base = _triangle_offset(n, i) - i
+            row = matrix[i]
+            for j in range(i, n):
+                row[j] = matrix[j][i] = data[base + j]
+    else:
+        matrix = [data[i * n:(i + 1) * n].tolist() for i in range(n)]
+    return matrix
+
+
+def _load_binary_ndarray(filename):
+    """
+    Читает двоичную матрицу сразу в массив NumPy (без промежуточных списков);
+    верхний треугольник симметричной матрицы отражается построчными срезами.
+    """
+    with open(filename, 'rb') as f:
+        typecode, symmetric, n = _read_header(f.read(BINARY_HEADER.size))
+        data = np.fromfile(f, dtype=np.dtype(typecode).newbyteorder('<'))
+    dtype = np.dtype(typecode)
+    if not symmetric:
+        return data.astype(dtype, copy=False).reshape(n, n)
+    matrix = np.empty((n, n), dtype=dtype)
+    for i in range(n):
+        base = _triangle_offset(n, i)
+        row = data[base:base + n - i]
+        matrix[i, i:] = row
+        matrix[i:, i] = row
+    return matrix
+
+
+def load_matrix(filename, backend="list", use_mmap=False):
+    """
+    Загружает матрицу из файла. Текстовый и двоичный форматы определяются автоматически.
+    При use_mmap=True двоичный файл отображается в память (MappedMatrix или numpy.memmap).
+    """
+    if is_binary_matrix_file(filename):
+        return _load_binary_matrix(filename, backend, use_mmap)
     with open(filename, 'r') as f:
         n = int(f.readline())
         matrix = []
         for _ in range(n):
             row = list(map(int, f.readline().split()))
             matrix.append(row)
+    if backend == "numpy":
+        return to_ndarray(matrix)
     return matrix
 
 
@@ -65,6 +293,8 @@ def lower_bound_half_sum(matrix, pieces):
     """
     Вычисляет нижнюю оценку на основе полусуммы двух легчайших допустимых дуг для каждого куска.
     """
+    if is_ndarray(matrix):
+        return _lower_bound_half_sum_np(matrix, pieces)
     total = 0
     for i, (s_i, e_i) in enumerate(pieces):
         min_out = math.inf
@@ -86,6 +316,8 @@ def lower_bound_MST(matrix, pieces):
     """
     Вычисляет нижнюю оценку на основе веса минимального остовного дерева (МОД).
     """
+    if is_ndarray(matrix):
+        return _lower_bound_MST_np(matrix, pieces)
     n = len(pieces)
     if n == 0:
         return 0
@@ -114,7 +346,119 @@ def lower_bound_MST(matrix, pieces):
     return total_weight
 
 
-def compute_lower_bound(matrix, chain, remaining):
+def _piece_weights_np(matrix, pieces):
+    # w[i][j] = matrix[e_i][s_j] — вес дуги из куска i в кусок j
+    starts = np.fromiter((s for s, _ in pieces), dtype=np.intp, count=len(pieces))
+    ends = np.fromiter((e for _, e in pieces), dtype=np.intp, count=len(pieces))
+    return matrix[np.ix_(ends, starts)].astype(np.float64)
+
+
+def _as_matrix_scalar(matrix, value):
+    return int(value) if np.issubdtype(matrix.dtype, np.integer) else float(value)
+
+
+def _lower_bound_half_sum_np(matrix, pieces):
+    if len(pieces) < 2:
+        return math.inf if pieces else 0
+    w = _piece_weights_np(matrix, pieces)
+    np.fill_diagonal(w, np.inf)
+    total = w.min(axis=1).sum() + w.min(axis=0).sum()
+    return _as_matrix_scalar(matrix, total) / 2
+
+
+def _lower_bound_MST_np(matrix, pieces):
+    n = len(pieces)
+    if n == 0:
+        return 0
+    w = _piece_weights_np(matrix, pieces)
+    w = np.minimum(w, w.T)
+    in_mst = np.zeros(n, dtype=bool)
+    key = np.full(n, np.inf)
+    key[0] = 0
+    total_weight = 0.0
+    for _ in range(n):
+        u = int(np.where(in_mst, np.inf, key).argmin())
+        in_mst[u] = True
+        total_weight += key[u]
+        np.minimum(key, w[u], out=key)
+    return _as_matrix_scalar(matrix, total_weight)
+
+
+class SearchStats:
+    """
+    Статистика поиска МВиГ: раскрытые узлы, отсечения по глубине, время подсчёта оценок,
+    какая из оценок оказалась точнее и моменты улучшения рекорда.
+    """
+
+    def __init__(self, started=None):
+        self.started = time.time() if started is None else started
+        self.nodes_expanded = 0
+        self.pruned_by_depth = {}
+        self.half_sum_time = 0.0
+        self.mst_time = 0.0
+        self.tighter = {'half_sum': 0, 'mst': 0, 'equal': 0}
+        self.initial_bound = math.inf
+        self.improvements = []
+
+    def prune(self, depth):
+        self.pruned_by_depth[depth] = self.pruned_by_depth.get(depth, 0) + 1
+
+    def improve(self, cost):
+        self.improvements.append((time.time() - self.started, cost))
+
+    def record_bounds(self, lb_half, lb_mst, half_time, mst_time):
+        self.half_sum_time += half_time
+        self.record_mst(lb_half, lb_mst, mst_time)
+
+    def record_mst(self, lb_half, lb_mst, mst_time):
+        self.mst_time += mst_time
+        if lb_half > lb_mst:
+            self.tighter['half_sum'] += 1
+        elif lb_mst > lb_half:
+            self.tighter['mst'] += 1
+        else:
+            self.tighter['equal'] += 1
+
+    def merge(self, other):
+        """
+        Добавляет статистику другого поиска (например, подзадачи параллельного МВиГ).
+        """
+        self.nodes_expanded += other.nodes_expanded
+        for depth, count in other.pruned_by_depth.items():
+            self.pruned_by_depth[depth] = self.pruned_by_depth.get(depth, 0) + count
+        self.half_sum_time += other.half_sum_time
+        self.mst_time += other.mst_time
+        for key, count in other.tighter.items():
+            self.tighter[key] = self.tighter.get(key, 0) + count
+        self.improvements.extend((other.started - self.started + t, cost) for t, cost in other.improvements)
+        self.improvements.sort()
+
+    def as_dict(self):
+        return {
+            'nodes_expanded': self.nodes_expanded,
+            'nodes_pruned': sum(self.pruned_by_depth.values()),
+            'pruned_by_depth': {str(d): c for d, c in sorted(self.pruned_by_depth.items())},
+            'half_sum_time': self.half_sum_time,
+            'mst_time': self.mst_time,
+            'tighter_bound': dict(self.tighter),
+            'initial_bound': None if self.initial_bound == math.inf else self.initial_bound,
+            'improvements': [{'time': t, 'cost': cost} for t, cost in self.improvements],
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), ensure_ascii=False, indent=2)
+
+
+def _timed_bounds(lower_half, lower_mst, stats):
+    t0 = time.perf_counter()
+    lb1 = lower_half()
+    t1 = time.perf_counter()
+    lb2 = lower_mst()
+    stats.record_bounds(lb1, lb2, t1 - t0, time.perf_counter() - t1)
+    return max(lb1, lb2)
+
+
+def compute_lower_bound(matrix, chain, remaining, stats=None):
     """
     Вычисляет нижнюю оценку остатка пути.
     Если remaining пуст, возвращает 0.
@@ -122,75 +466,920 @@ def compute_lower_bound(matrix, chain, remaining):
     if not remaining:
         return 0
     pieces = get_pieces(chain, remaining)
+    if stats is not None:
+        return _timed_bounds(lambda: lower_bound_half_sum(matrix, pieces),
+                             lambda: lower_bound_MST(matrix, pieces), stats)
     lb1 = lower_bound_half_sum(matrix, pieces)
     lb2 = lower_bound_MST(matrix, pieces)
     return max(lb1, lb2)
 
 
-def tsp_branch_and_bound(matrix, start=0):
+def compute_half_sum_bound(matrix, chain, remaining, stats=None):
     """
-    Решение задачи коммивояжёра методом МВиГ (ветвление с отсечением).
+    Только оценка полусуммы (для упорядочивания кандидатов); МОД считается в compute_mst_bound
+    один раз при входе в узел.
+    """
+    if not remaining:
+        return 0
+    t0 = time.perf_counter()
+    lb = lower_bound_half_sum(matrix, get_pieces(chain, remaining))
+    if stats is not None:
+        stats.half_sum_time += time.perf_counter() - t0
+    return lb
+
+
+def compute_mst_bound(matrix, chain, remaining, engine=None, stats=None, lb_half=0):
+    """
+    Оценка МОД для узла; при engine – по его текущему состоянию (цепочка узла уже добавлена push).
+    lb_half – оценка полусуммы того же узла, нужна только для статистики.
+    """
+    if not remaining:
+        return 0
+    t0 = time.perf_counter()
+    if engine is not None:
+        lb = engine.mst(engine.remaining)
+    else:
+        lb = lower_bound_MST(matrix, get_pieces(chain, remaining))
+    if stats is not None:
+        stats.record_mst(lb_half, lb, time.perf_counter() - t0)
+    return lb
+
+
+class IncrementalBound:
+    """
+    Инкрементальный подсчёт нижней оценки для МВиГ.
+    Хранит таблицы легчайших входящих/исходящих дуг для вершин из remaining
+    (указатели в заранее отсортированные списки дуг) и симметризованную матрицу для МОД.
+    При переносе вершины из remaining в цепочку (push) таблицы и упорядоченный список remaining
+    обновляются за O(n), при возврате (pop) восстанавливаются из стека изменений.
+    half_sum_bound() стоит O(k) и используется для каждого кандидата; МОД (O(k^2)) не поддерживается
+    инкрементально и считается один раз на узел (compute_mst_bound).
+    Значение bound() совпадает с compute_lower_bound(matrix, chain, remaining).
+    """
+
+    def __init__(self, matrix, start=0):
+        n = len(matrix)
+        self.matrix = matrix
+        self.n = n
+        self.start = start
+        self.last = start
+        self.in_remaining = [v != start for v in range(n)]
+        self.remaining = [v for v in range(n) if v != start]
+        self.remaining_count = n - 1
+        self.out_order = [sorted((u for u in range(n) if u != v), key=lambda u: matrix[v][u]) for v in range(n)]
+        self.in_order = [sorted((u for u in range(n) if u != v), key=lambda u: matrix[u][v]) for v in range(n)]
+        self.out_ptr = [0] * n
+        self.in_ptr = [0] * n
+        self.sym = [[min(matrix[i][j], matrix[j][i]) for j in range(n)] for i in range(n)]
+        self.history = []
+        for v in range(n):
+            self.out_ptr[v] = self._advance_out(v, 0)
+            self.in_ptr[v] = self._advance_in(v, 0)
+
+    def _advance_out(self, v, ptr):
+        # Допустимая исходящая дуга ведёт в вершину из remaining или в начало цепочки
+        order = self.out_order[v]
+        while ptr < len(order) and not (self.in_remaining[order[ptr]] or order[ptr] == self.start):
+            ptr += 1
+        return ptr
+
+    def _advance_in(self, v, ptr):
+        # Допустимая входящая дуга (без учёта конца цепочки) идёт из вершины remaining
+        order = self.in_order[v]
+        while ptr < len(order) and not self.in_remaining[order[ptr]]:
+            ptr += 1
+        return ptr
+
+    def push(self, v):
+        """
+        Переносит вершину v из remaining в конец цепочки.
+        """
+        self.in_remaining[v] = False
+        self.remaining.remove(v)
+        self.remaining_count -= 1
+        changes = []
+        for u in range(self.n):
+            if self.in_remaining[u]:
+                ptr = self.out_ptr[u]
+                if ptr < len(self.out_order[u]) and self.out_order[u][ptr] == v:
+                    changes.append((self.out_ptr, u, ptr))
+                    self.out_ptr[u] = self._advance_out(u, ptr + 1)
+            if self.in_remaining[u] or u == self.start:
+                ptr = self.in_ptr[u]
+                if ptr < len(self.in_order[u]) and self.in_order[u][ptr] == v:
+                    changes.append((self.in_ptr, u, ptr))
+                    self.in_ptr[u] = self._advance_in(u, ptr + 1)
+        self.history.append((v, self.last, changes))
+        self.last = v
+
+    def pop(self):
+        """
+        Отменяет последний push.
+        """
+        v, last, changes = self.history.pop()
+        for table, u, ptr in changes:
+            table[u] = ptr
+        self.in_remaining[v] = True
+        bisect.insort(self.remaining, v)
+        self.remaining_count += 1
+        self.last = last
+
+    def _min_in(self, v):
+        ptr = self.in_ptr[v]
+        order = self.in_order[v]
+        return self.matrix[order[ptr]][v] if ptr < len(order) else math.inf
+
+    def _min_out(self, v):
+        ptr = self.out_ptr[v]
+        order = self.out_order[v]
+        return self.matrix[v][order[ptr]] if ptr < len(order) else math.inf
+
+    def half_sum(self, rem):
+        matrix = self.matrix
+        last_row = matrix[self.last]
+        total = min(last_row[u] for u in rem) + self._min_in(self.start)
+        for u in rem:
+            total += self._min_out(u) + min(self._min_in(u), last_row[u])
+        return total / 2
+
+    def mst(self, rem):
+        matrix = self.matrix
+        sym = self.sym
+        last_row = matrix[self.last]
+        start = self.start
+        # Кусок-цепочка добавлен в дерево первым, ключи остальных — веса связи с ним
+        key = [min(last_row[u], matrix[u][start]) for u in rem]
+        k = len(rem)
+        in_mst = [False] * k
+        total_weight = 0
+        for _ in range(k):
+            u = -1
+            min_val = math.inf
+            for i in range(k):
+                if not in_mst[i] and key[i] < min_val:
+                    min_val = key[i]
+                    u = i
+            if u == -1:
+                break
+            in_mst[u] = True
+            total_weight += min_val
+            row = sym[rem[u]]
+            for i in range(k):
+                if not in_mst[i]:
+                    w = row[rem[i]]
+                    if w < key[i]:
+                        key[i] = w
+        return total_weight
+
+    def bound(self, stats=None):
+        """
+        Нижняя оценка остатка пути для текущего состояния цепочки.
+        """
+        if not self.remaining_count:
+            return 0
+        rem = self.remaining
+        if stats is not None:
+            return _timed_bounds(lambda: self.half_sum(rem), lambda: self.mst(rem), stats)
+        return max(self.half_sum(rem), self.mst(rem))
+
+    def half_sum_bound(self, stats=None):
+        """
+        Оценка полусуммы для текущего состояния цепочки, O(k).
+        """
+        if not self.remaining_count:
+            return 0
+        t0 = time.perf_counter()
+        lb = self.half_sum(self.remaining)
+        if stats is not None:
+            stats.half_sum_time += time.perf_counter() - t0
+        return lb
+
+
+class OneTreeBound:
+    """
+    Лагранжева оценка Хелда–Карпа на 1-деревьях.
+    Цепочка стягивается в одну вершину C, соединённую с двумя разными вершинами remaining:
+    дугой из конца цепочки и дугой в start. 1-дерево – МОД на remaining (вес ребра –
+    меньшая из двух дуг) плюс эти две дуги. Штрафы вершин pi подбираются субградиентным методом
+    (шаг Поляка с целевым значением на 5% выше текущей оценки) и передаются потомкам узла
+    как начальное приближение. Результат зависит только от цепочки, поэтому порядок обхода
+    детерминирован.
+    """
+
+    def __init__(self, matrix, start=0, root_iterations=50, iterations=10):
+        n = len(matrix)
+        self.matrix = matrix
+        self.n = n
+        self.start = start
+        self.root_iterations = root_iterations
+        self.iterations = iterations
+        self.sym = [[min(matrix[i][j], matrix[j][i]) for j in range(n)] for i in range(n)]
+        self.integral = all(isinstance(w, int) for row in matrix for w in row)
+
+    def one_tree(self, last, rem, pi):
+        """
+        Вес минимального 1-дерева при штрафах pi и степени вершин rem в нём.
+        """
+        matrix, sym = self.matrix, self.sym
+        k = len(rem)
+        key = [math.inf] * k
+        parent = [-1] * k
+        in_tree = [False] * k
+        degree = [0] * k
+        key[0] = 0
+        total = 0
+        for _ in range(k):
+            u = -1
+            min_val = math.inf
+            for i in range(k):
+                if not in_tree[i] and key[i] < min_val:
+                    min_val = key[i]
+                    u = i
+            in_tree[u] = True
+            total += min_val
+            if parent[u] >= 0:
+                degree[u] += 1
+                degree[parent[u]] += 1
+            a = rem[u]
+            row = sym[a]
+            pa = pi[a]
+            for i in range(k):
+                if not in_tree[i]:
+                    w = row[rem[i]] + pa + pi[rem[i]]
+                    if w < key[i]:
+                        key[i] = w
+                        parent[i] = u
+
+        last_row = matrix[last]
+        out_w = [last_row[u] + pi[u] for u in rem]
+        in_w = [matrix[u][self.start] + pi[u] for u in rem]
+        best_pair = None
+        for a in sorted(range(k), key=out_w.__getitem__)[:2]:
+            for b in sorted(range(k), key=in_w.__getitem__)[:2]:
+                if a != b and (best_pair is None or out_w[a] + in_w[b] < best_pair[0]):
+                    best_pair = (out_w[a] + in_w[b], a, b)
+        total += best_pair[0]
+        degree[best_pair[1]] += 1
+        degree[best_pair[2]] += 1
+        return total, degree
+
+    def bound(self, last, rem, pi, iterations=None):
+        """
+        Нижняя оценка остатка пути от last через rem в start. Возвращает (оценка, штрафы).
+        """
+        k = len(rem)
+        if k == 0:
+            return 0, pi
+        if k == 1:
+            u = rem[0]
+            return self.matrix[last][u] + self.matrix[u][self.start], pi
+        if iterations is None:
+            iterations = self.iterations
+        best_lb, best_pi = -math.inf, pi
+        step = 2.0
+        for _ in range(iterations):
+            total, degree = self.one_tree(last, rem, pi)
+            lb = total - 2 * sum(pi[u] for u in rem)
+            if lb > best_lb:
+                best_lb, best_pi = lb, pi
+            norm = sum((d - 2) ** 2 for d in degree)
+            if norm == 0:
+                break
+            t = step * 0.05 * max(abs(lb), 1) / norm
+            pi = pi.copy()
+            for i, u in enumerate(rem):
+                pi[u] += t * (degree[i] - 2)
+            step *= 0.9
+        # Защита от ошибок округления при сравнении с рекордом
+        if self.integral:
+            return math.ceil(best_lb - 1e-6), best_pi
+        return best_lb - 1e-9 * (1 + abs(best_lb)), best_pi
+
+    def root_penalties(self, remaining):
+        return self.bound(self.start, remaining, [0.0] * self.n, self.root_iterations)[1]
+
+    def penalties_for(self, chain):
+        """
+        Штрафы узла с цепочкой chain – те же, что получает этот узел при обходе от корня.
+        """
+        pi = self.root_penalties([i for i in range(self.n) if i != self.start])
+        for i in range(1, len(chain)):
+            rem = [u for u in range(self.n) if u not in chain[:i + 1]]
+            pi = self.bound(chain[i], rem, pi)[1]
+        return pi
+
+
+def _candidates(matrix, bound_matrix, engine, chain, remaining, stats=None, onetree=None, pi=None):
+    """
+    Оценивает продолжения цепочки и упорядочивает их по edge_cost + lb.
+    lb – оценка полусуммы (и 1-дерева при onetree); оценка МОД проверяется позже,
+    один раз при входе в узел (compute_mst_bound), а не для каждого кандидата.
+    Элементы результата: (v, edge_cost, lb, штрафы 1-дерева для потомка или None).
+    """
+    candidates = []
+    for v in remaining:
+        edge_cost = matrix[chain[-1]][v]
+        child_pi = None
+        if engine is not None:
+            engine.push(v)
+            lb = engine.half_sum_bound(stats)
+            engine.pop()
+        else:
+            new_chain = chain + [v]
+            new_remaining = remaining.copy()
+            new_remaining.remove(v)
+            lb = compute_half_sum_bound(bound_matrix, new_chain, new_remaining, stats)
+        if onetree is not None:
+            lb_tree, child_pi = onetree.bound(v, [u for u in remaining if u != v], pi)
+            lb = max(lb, lb_tree)
+        candidates.append((v, edge_cost, lb, child_pi))
+        if DEBUG:
+            debug_print(f"Кандидат: добавляем {v}, edge_cost={edge_cost}, lb={lb}, chain={chain}")
+
+    candidates.sort(key=lambda x: x[1] + x[2])
+    return candidates
+
+
+def initial_upper_bound(matrix, start=0):
+    """
+    Начальная верхняя оценка для МВиГ: тур локального поиска tsp_local_search.
+    """
+    path, cost = tsp_local_search(matrix, start)
+    if DEBUG:
+        debug_print(f"Начальная верхняя оценка: {cost}, тур {path}")
+    return path, cost
+
+
+def _branch_and_bound(matrix, start=0, incremental=True, prefix=None, shared=None, upper_bound=None, stats=None,
+                      bound="classic"):
+    """
+    МВиГ с подсчётом раскрытых узлов. Возвращает (путь, стоимость, число узлов).
+    prefix – начальная цепочка поддерева (по умолчанию [start]).
+    shared – общая для процессов стоимость лучшего тура (multiprocessing.Value),
+    используется для отсечения и обновляется при нахождении лучшего тура.
+    upper_bound – пара (путь, стоимость) известного тура, с которой начинается поиск.
+    stats – объект SearchStats, который заполняется по ходу поиска.
+    bound="onetree" добавляет к оценке лагранжеву оценку OneTreeBound.
     """
     n = len(matrix)
     best = {'cost': math.inf, 'path': None}
+    if upper_bound is not None:
+        best['path'], best['cost'] = upper_bound
+        if stats is not None:
+            stats.initial_bound = upper_bound[1]
+    nodes = 0
+    bound_matrix = matrix
+    matrix = to_list(matrix)
+    engine = IncrementalBound(matrix, start) if incremental else None
+    onetree = OneTreeBound(matrix, start) if bound == "onetree" else None
 
-    def search(chain, current_cost, remaining):
-        nonlocal best
+    def incumbent():
+        if shared is None:
+            return best['cost']
+        return min(best['cost'], shared.value)
+
+    def search(chain, current_cost, remaining, pi):
+        nonlocal best, nodes
+        nodes += 1
         if len(chain) == n:
             tour_cost = current_cost + matrix[chain[-1]][start]
-            if tour_cost < best['cost']:
+            # Тур той же стоимости, что и найденный другим процессом, тоже запоминаем:
+            # из равных туров итоговый выбирается по порядку поддеревьев
+            if tour_cost < best['cost'] and (shared is None or tour_cost <= shared.value):
                 best['cost'] = tour_cost
                 best['path'] = chain + [start]
-                debug_print(f"Найден новый тур: {best['path']} с ценой {best['cost']}")
+                if stats is not None:
+                    stats.improve(tour_cost)
+                if DEBUG:
+                    debug_print(f"Найден новый тур: {best['path']} с ценой {best['cost']}")
+                if shared is not None:
+                    with shared.get_lock():
+                        if tour_cost < shared.value:
+                            shared.value = tour_cost
             return
 
-        candidates = []
-        for v in remaining:
-            edge_cost = matrix[chain[-1]][v]
+        candidates = _candidates(matrix, bound_matrix, engine, chain, remaining, stats, onetree, pi)
+        for v, edge_cost, lb, child_pi in candidates:
+            total_estimate = current_cost + edge_cost + lb
+            best_cost = incumbent()
+            if DEBUG:
+                debug_print(
+                    f"Проверка: текущая стоимость={current_cost}, индекс вершины={v}, edge_cost={edge_cost}, "
+                    f"lb={lb}, total_estimate={total_estimate}, best={best_cost}")
+            if total_estimate > best_cost:
+                if DEBUG:
+                    debug_print("Отсекаем ветку")
+                if stats is not None:
+                    stats.prune(len(chain))
+                continue
             new_chain = chain + [v]
             new_remaining = remaining.copy()
             new_remaining.remove(v)
-            lb = compute_lower_bound(matrix, new_chain, new_remaining)
-            candidates.append((v, edge_cost, lb))
-            debug_print(f"Кандидат: добавляем {v}, edge_cost={edge_cost}, lb={lb}, chain={chain}")
+            if engine is not None:
+                engine.push(v)
+            # Оценка МОД – один раз для узла, который прошёл отсечение по полусумме
+            lb_mst = compute_mst_bound(bound_matrix, new_chain, new_remaining, engine, stats, lb)
+            if current_cost + edge_cost + lb_mst > incumbent():
+                if DEBUG:
+                    debug_print(f"Отсекаем ветку по МОД: lb_mst={lb_mst}")
+                if stats is not None:
+                    stats.prune(len(chain))
+            else:
+                search(new_chain, current_cost + edge_cost, new_remaining, child_pi)
+            if engine is not None:
+                engine.pop()
 
-        candidates.sort(key=lambda x: x[1] + x[2])
-        for v, edge_cost, lb in candidates:
-            total_estimate = current_cost + edge_cost + lb
-            debug_print(
-                f"Проверка: текущая стоимость={current_cost}, индекс вершины={v}, edge_cost={edge_cost}, lb={lb}, "
-                f"total_estimate={total_estimate}, best={best['cost']}")
-            if total_estimate > best['cost']:
+    chain = list(prefix) if prefix else [start]
+    current_cost = 0
+    for u, v in zip(chain, chain[1:]):
+        current_cost += matrix[u][v]
+        if engine is not None:
+            engine.push(v)
+    remaining = [i for i in range(n) if i not in chain]
+    pi = onetree.penalties_for(chain) if onetree is not None else None
+    search(chain, current_cost, remaining, pi)
+    if stats is not None:
+        stats.nodes_expanded += nodes
+    return best['path'], best['cost'], nodes
+
+
+def tsp_branch_and_bound(matrix, start=0, incremental=True, warm_start=False, collect_stats=False, bound="classic"):
+    """
+    Решение задачи коммивояжёра методом МВиГ (ветвление с отсечением).
+    Если incremental=False, нижняя оценка пересчитывается с нуля для каждого кандидата.
+    Если warm_start=True, поиск начинается с тура initial_upper_bound вместо бесконечной оценки.
+    Если collect_stats=True, возвращается тройка (путь, стоимость, SearchStats).
+    bound: "classic" – полусумма и МОД, "onetree" – дополнительно оценка OneTreeBound.
+    """
+    stats = SearchStats() if collect_stats else None
+    upper_bound = initial_upper_bound(matrix, start) if warm_start else None
+    path, cost, _ = _branch_and_bound(matrix, start, incremental, upper_bound=upper_bound, stats=stats,
+                                      bound=bound)
+    if collect_stats:
+        return path, cost, stats
+    return path, cost
+
+
+def split_subproblems(matrix, start=0, depth=2, bound="classic"):
+    """
+    Разбивает дерево поиска МВиГ на поддеревья: цепочки из depth + 1 вершин
+    в том порядке, в котором их обходит последовательный поиск.
+    """
+    n = len(matrix)
+    bound_matrix = matrix
+    matrix = to_list(matrix)
+    onetree = OneTreeBound(matrix, start) if bound == "onetree" else None
+    root_pi = onetree.root_penalties([i for i in range(n) if i != start]) if onetree is not None else None
+    level = [([start], root_pi)]
+    for _ in range(depth):
+        next_level = []
+        for chain, pi in level:
+            if len(chain) == n:
+                next_level.append((chain, pi))
+                continue
+            remaining = [i for i in range(n) if i not in chain]
+            for v, _, _, child_pi in _candidates(matrix, bound_matrix, None, chain, remaining, None, onetree, pi):
+                next_level.append((chain + [v], child_pi))
+        level = next_level
+    return [chain for chain, _ in level]
+
+
+_worker_state = {}
+
+
+def _init_worker(matrix, start, incremental, shared, debug, stats_started, bound):
+    global DEBUG
+    DEBUG = debug
+    _worker_state.update(matrix=matrix, start=start, incremental=incremental, shared=shared,
+                         stats_started=stats_started, bound=bound)
+
+
+def _solve_subproblem(prefix):
+    state = _worker_state
+    stats = SearchStats(state['stats_started']) if state['stats_started'] is not None else None
+    path, cost, nodes = _branch_and_bound(state['matrix'], state['start'], state['incremental'], prefix,
+                                          state['shared'], stats=stats, bound=state['bound'])
+    return path, cost, nodes, stats
+
+
+def tsp_branch_and_bound_parallel(matrix, start=0, workers=2, depth=2, incremental=True, warm_start=False,
+                                  collect_stats=False, bound="classic"):
+    """
+    Параллельный МВиГ: поддеревья глубины depth решаются в пуле процессов,
+    стоимость лучшего тура общая для всех процессов (разделяемая память).
+    Результат совпадает с tsp_branch_and_bound.
+    Если collect_stats=True, возвращается тройка (путь, стоимость, SearchStats) со сводной статистикой.
+    """
+    n = len(matrix)
+    if workers <= 1 or n - 1 <= depth:
+        return tsp_branch_and_bound(matrix, start, incremental, warm_start, collect_stats, bound)
+
+    stats = SearchStats() if collect_stats else None
+    upper_bound = initial_upper_bound(matrix, start) if warm_start else (None, math.inf)
+    if stats is not None:
+        stats.initial_bound = upper_bound[1]
+    prefixes = split_subproblems(matrix, start, depth, bound)
+    if DEBUG:
+        debug_print(f"Подзадач: {len(prefixes)}, процессов: {workers}")
+    shared = multiprocessing.Value('d', upper_bound[1])
+    results = [None] * len(prefixes)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(matrix, start, incremental, shared, DEBUG,
+                                       stats.started if stats is not None else None, bound)) as pool:
+        futures = {pool.submit(_solve_subproblem, prefix): idx for idx, prefix in enumerate(prefixes)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    # Из туров минимальной стоимости берём первый в порядке обхода последовательного поиска
+    best_path, best_cost = upper_bound
+    for path, cost, _, sub_stats in results:
+        if cost < best_cost:
+            best_path, best_cost = path, cost
+        if stats is not None:
+            stats.merge(sub_stats)
+    if collect_stats:
+        return best_path, best_cost, stats
+    return best_path, best_cost
+
+
+def _link_to_chain(link):
+    # link – вложенные пары (вершина, ссылка на родителя); None у корня
+    chain = []
+    while link is not None:
+        chain.append(link[0])
+        link = link[1]
+    chain.reverse()
+    return chain
+
+
+def _sync_engine(engine, path):
+    """
+    Приводит состояние IncrementalBound к цепочке start + path,
+    отменяя только расходящуюся часть истории.
+    """
+    history = engine.history
+    common = 0
+    while common < len(history) and common < len(path) and history[common][0] == path[common]:
+        common += 1
+    while len(history) > common:
+        engine.pop()
+    for v in path[common:]:
+        engine.push(v)
+
+
+def tsp_search(matrix, start=0, strategy="dfs", node_limit=None, time_limit=None, max_open=None,
+               incremental=True, warm_start=False, collect_stats=False, bound="classic"):
+    """
+    МВиГ на явном стеке/очереди без рекурсии.
+    strategy="dfs" – обход в глубину (тот же порядок, что у tsp_branch_and_bound),
+    strategy="best" – лучший-первый по оценке current_cost + edge_cost + lb (lb – полусумма;
+    оценка МОД проверяется один раз, когда узел берётся из стека или очереди).
+    Узел хранит маску посещённых вершин и ссылку на родителя вместо копий списков.
+    node_limit и time_limit ограничивают поиск (возвращается лучший найденный тур),
+    max_open ограничивает размер очереди: при переполнении потомки раскрываются в глубину.
+    warm_start=True начинает поиск с тура initial_upper_bound.
+    Возвращает (путь, стоимость, info), где info – словарь с числом узлов и признаком полного перебора;
+    при collect_stats=True в info['stats'] кладётся SearchStats.
+    bound – как в tsp_branch_and_bound; штрафы 1-дерева хранятся в узле.
+    """
+    n = len(matrix)
+    bound_matrix = matrix
+    matrix = to_list(matrix)
+    engine = IncrementalBound(matrix, start) if incremental else None
+    onetree = OneTreeBound(matrix, start) if bound == "onetree" else None
+    full_mask = (1 << n) - 1
+    best = {'cost': math.inf, 'link': None, 'path': None}
+    if warm_start:
+        best['path'], best['cost'] = initial_upper_bound(matrix, start)
+    info = {'nodes': 0, 'complete': True, 'max_open': 0, 'initial_bound': best['cost']}
+    stats = SearchStats() if collect_stats else None
+    if stats is not None:
+        stats.initial_bound = best['cost']
+        info['stats'] = stats
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+    # Узел: (оценка, стоимость цепочки, маска, последняя вершина, ссылка на цепочку, штрафы 1-дерева)
+    root_link = (start, None)
+    root_pi = onetree.root_penalties([i for i in range(n) if i != start]) if onetree is not None else None
+    stack = [(0, 0, 1 << start, start, root_link, root_pi)]
+    heap = []
+    counter = 0
+
+    while stack or heap:
+        if stack:
+            estimate, cost, mask, v, link, pi = stack.pop()
+        else:
+            estimate, _, cost, mask, v, link, pi = heapq.heappop(heap)
+        if estimate > best['cost']:
+            if DEBUG:
                 debug_print("Отсекаем ветку")
+            if stats is not None:
+                stats.prune(bin(mask).count("1") - 1)
+            continue
+        if (node_limit is not None and info['nodes'] >= node_limit) or \
+                (deadline is not None and time.perf_counter() > deadline):
+            info['complete'] = False
+            break
+        if mask != full_mask:
+            remaining = [u for u in range(n) if not mask >> u & 1]
+            if engine is not None:
+                _sync_engine(engine, _link_to_chain(link)[1:])
+            if link[1] is not None:
+                # Оценка МОД – один раз для узла, оценка потомков при их создании – только полусумма
+                lb_mst = compute_mst_bound(bound_matrix, (start, v), remaining, engine, stats, estimate - cost)
+                if cost + lb_mst > best['cost']:
+                    if DEBUG:
+                        debug_print(f"Отсекаем ветку по МОД: lb_mst={lb_mst}")
+                    if stats is not None:
+                        stats.prune(bin(mask).count("1") - 1)
+                    continue
+        info['nodes'] += 1
+        if stats is not None:
+            stats.nodes_expanded += 1
+
+        if mask == full_mask:
+            tour_cost = cost + matrix[v][start]
+            if tour_cost < best['cost']:
+                best['cost'] = tour_cost
+                best['link'] = link
+                if stats is not None:
+                    stats.improve(tour_cost)
+                if DEBUG:
+                    debug_print(f"Найден новый тур с ценой {tour_cost}")
+            continue
+
+        row = matrix[v]
+        children = []
+        for u in remaining:
+            edge_cost = row[u]
+            if engine is not None:
+                engine.push(u)
+                lb = engine.half_sum_bound(stats)
+                engine.pop()
+            else:
+                lb = compute_half_sum_bound(bound_matrix, (start, u), [w for w in remaining if w != u], stats)
+            child_pi = None
+            if onetree is not None:
+                lb_tree, child_pi = onetree.bound(u, [w for w in remaining if w != u], pi)
+                lb = max(lb, lb_tree)
+            children.append((cost + edge_cost + lb, edge_cost + lb, cost + edge_cost, u, child_pi))
+        children.sort(key=lambda x: x[1])
+
+        if strategy == "dfs" or (max_open is not None and len(heap) >= max_open):
+            for child_estimate, _, child_cost, u, child_pi in reversed(children):
+                stack.append((child_estimate, child_cost, mask | 1 << u, u, (u, link), child_pi))
+        else:
+            for child_estimate, _, child_cost, u, child_pi in children:
+                counter += 1
+                heapq.heappush(heap, (child_estimate, counter, child_cost, mask | 1 << u, u, (u, link), child_pi))
+        info['max_open'] = max(info['max_open'], len(heap) + len(stack))
+
+    if best['link'] is None:
+        return best['path'], best['cost'], info
+    return _link_to_chain(best['link']) + [start], best['cost'], info
+
+
+def benchmark_bounds(n, trials=3, symmetric=False, seed=0):
+    """
+    Сравнивает скорость (узлов в секунду) МВиГ с пересчётом оценки с нуля и с инкрементальной оценкой.
+    """
+    results = []
+    for trial in range(trials):
+        random.seed(seed + trial)
+        matrix = generate_matrix(n, symmetric=symmetric)
+        row = {}
+        for name, incremental in (("recompute", False), ("incremental", True)):
+            t0 = time.perf_counter()
+            path, cost, nodes = _branch_and_bound(matrix, 0, incremental)
+            elapsed = time.perf_counter() - t0
+            row[name] = (cost, nodes, elapsed)
+        if row["recompute"][:2] != row["incremental"][:2]:
+            raise RuntimeError(f"Результаты методов расходятся: {row}")
+        results.append(row)
+        print(f"Тест {trial + 1}: n={n}, стоимость={row['incremental'][0]}, узлов={row['incremental'][1]}")
+        for name, (cost, nodes, elapsed) in row.items():
+            print(f"  {name:>11}: {elapsed:8.3f} с, {nodes / elapsed if elapsed else math.inf:10.0f} узлов/с")
+    return results
+
+
+def benchmark_warm_start(n, trials=3, symmetric=False, seed=0):
+    """
+    Сравнивает число раскрытых узлов МВиГ без начальной оценки и с начальной оценкой initial_upper_bound.
+    """
+    results = []
+    for trial in range(trials):
+        random.seed(seed + trial)
+        matrix = generate_matrix(n, symmetric=symmetric)
+        t0 = time.perf_counter()
+        _, cold_cost, cold_nodes = _branch_and_bound(matrix, 0)
+        cold_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        upper_bound = initial_upper_bound(matrix, 0)
+        _, warm_cost, warm_nodes = _branch_and_bound(matrix, 0, upper_bound=upper_bound)
+        warm_time = time.perf_counter() - t0
+        if cold_cost != warm_cost:
+            raise RuntimeError(f"Стоимости расходятся: {cold_cost} и {warm_cost}")
+        results.append((cold_nodes, warm_nodes))
+        print(f"Тест {trial + 1}: n={n}, стоимость={cold_cost}, начальная оценка={upper_bound[1]}")
+        print(f"  без оценки: {cold_nodes:8} узлов, {cold_time:8.3f} с")
+        print(f"  с оценкой : {warm_nodes:8} узлов, {warm_time:8.3f} с")
+    return results
+
+
+def benchmark_onetree(n, trials=3, seed=0):
+    """
+    Сравнивает на симметричных матрицах оценку в корне и число узлов МВиГ
+    с оценками полусуммы/МОД и с лагранжевой оценкой 1-дерева.
+    """
+    results = []
+    for trial in range(trials):
+        random.seed(seed + trial)
+        matrix = generate_matrix(n, symmetric=True)
+        remaining = list(range(1, n))
+        classic_root = compute_lower_bound(matrix, [0], remaining)
+        onetree = OneTreeBound(matrix, 0)
+        tree_root = onetree.bound(0, remaining, [0.0] * n, onetree.root_iterations)[0]
+        row = {}
+        for name in ("classic", "onetree"):
+            t0 = time.perf_counter()
+            _, cost, nodes = _branch_and_bound(matrix, 0, bound=name)
+            row[name] = (cost, nodes, time.perf_counter() - t0)
+        if row["classic"][0] != row["onetree"][0]:
+            raise RuntimeError(f"Стоимости расходятся: {row}")
+        cost = row["classic"][0]
+        results.append(row)
+        print(f"Тест {trial + 1}: n={n}, оптимум={cost}")
+        for name, root in (("classic", classic_root), ("onetree", max(classic_root, tree_root))):
+            _, nodes, elapsed = row[name]
+            print(f"  {name:>7}: оценка в корне {root:8.1f} ({100 * root / cost if cost else 100:5.1f}% оптимума), "
+                  f"{nodes:8} узлов, {elapsed:8.3f} с")
+    return results
+
+
+def held_karp_memory(n, float32=False, use_numpy=None):
+    """
+    Оценка памяти (в байтах) под ДП Хелда–Карпа для n вершин:
+    2^(n-1) * (n-1) значений стоимости и столько же однобайтовых ссылок на предка.
+    Для NumPy-варианта (use_numpy=None – если numpy установлен) добавляются массив масок (int64),
+    popcount, временные массивы его подсчёта и наибольшего слоя (маски слоя, кандидаты, argmin)
+    и копия матрицы весов – это оценка пикового потребления сверху, а не только размер таблиц
+    (без постоянных накладных расходов интерпретатора).
+    """
+    if n <= 1:
+        return 0
+    if use_numpy is None:
+        use_numpy = np is not None
+    k = n - 1
+    size = 1 << k
+    item = 4 if float32 else 8
+    tables = size * k * (item + 1)
+    if not use_numpy:
+        return tables
+    layer = max((math.comb(k, s) for s in range(2, k + 1)), default=0)
+    sel = max((math.comb(k - 1, s - 1) for s in range(2, k + 1)), default=0)
+    # (masks >> b) & 1 при подсчёте popcount: два временных массива int64
+    setup = 16 * size
+    # Маска слоя (bool); маски слоя и временные массивы (layer >> j) & 1 == 1;
+    # sel, sel ^ (1 << j), argmin, arange и выбранные значения; до трёх массивов кандидатов sel x k
+    per_layer = size + 3 * 8 * layer + layer + 4 * 8 * sel + sel * item + 3 * sel * k * item
+    return tables + 9 * size + n * n * item + max(setup, per_layer)
+
+
+def _held_karp_tables(matrix, verts, start, float32):
+    k = len(verts)
+    size = 1 << k
+    dp = array('f' if float32 else 'd', [math.inf]) * (size * k)
+    parent = array('b', [-1]) * (size * k)
+    for j in range(k):
+        dp[(1 << j) * k + j] = matrix[start][verts[j]]
+
+    # Подмножества перебираются по возрастанию маски, поэтому prev < mask уже посчитано
+    for mask in range(1, size):
+        base = mask * k
+        for j in range(k):
+            if not mask >> j & 1:
                 continue
-            new_chain = chain + [v]
-            new_remaining = remaining.copy()
-            new_remaining.remove(v)
-            search(new_chain, current_cost + edge_cost, new_remaining)
+            prev = mask ^ (1 << j)
+            if not prev:
+                continue
+            pbase = prev * k
+            vj = verts[j]
+            best_val = math.inf
+            best_i = -1
+            for i in range(k):
+                if prev >> i & 1:
+                    val = dp[pbase + i] + matrix[verts[i]][vj]
+                    if val < best_val:
+                        best_val = val
+                        best_i = i
+            dp[base + j] = best_val
+            parent[base + j] = best_i
+    return dp, parent
+
+
+def _held_karp_tables_np(matrix, verts, start, float32):
+    k = len(verts)
+    size = 1 << k
+    dtype = np.float32 if float32 else np.float64
+    idx = np.asarray(verts, dtype=np.intp)
+    weights = np.asarray(matrix, dtype=dtype)
+    sub = weights[np.ix_(idx, idx)]
+    dp = np.full((size, k), np.inf, dtype=dtype)
+    parent = np.full((size, k), -1, dtype=np.int8)
+    dp[1 << np.arange(k), np.arange(k)] = weights[start, idx]
+
+    masks = np.arange(size)
+    popcount = np.zeros(size, dtype=np.int8)
+    for b in range(k):
+        popcount += (masks >> b) & 1
+    # Слой подмножеств размера s зависит только от слоя s - 1
+    for s in range(2, k + 1):
+        layer = masks[popcount == s]
+        for j in range(k):
+            sel = layer[(layer >> j) & 1 == 1]
+            cand = dp[sel ^ (1 << j)] + sub[:, j]
+            arg = cand.argmin(axis=1)
+            dp[sel, j] = cand[np.arange(len(sel)), arg]
+            parent[sel, j] = arg
+    return dp.reshape(-1), parent.reshape(-1)
+
+
+def tsp_held_karp(matrix, start=0, float32=False):
+    """
+    Точное решение задачи коммивояжёра динамическим программированием по подмножествам (Хелд–Карп).
+    Время O(2^n * n^2), память – см. held_karp_memory. Таблицы хранятся в плоских массивах
+    (array или NumPy, если он установлен); float32=True уменьшает таблицу стоимостей вдвое.
+    """
+    n = len(matrix)
+    if n <= 1:
+        return [start, start], 0
+    verts = [v for v in range(n) if v != start]
+    k = len(verts)
+    if np is not None:
+        dp, parent = _held_karp_tables_np(matrix, verts, start, float32)
+    else:
+        dp, parent = _held_karp_tables(to_list(matrix), verts, start, float32)
+
+    full = (1 << k) - 1
+    base = full * k
+    last = min(range(k), key=lambda j: dp[base + j] + matrix[verts[j]][start])
 
-    remaining = [i for i in range(n) if i != start]
-    search([start], 0, remaining)
-    return best['path'], best['cost']
+    path = []
+    mask, j = full, last
+    while j != -1:
+        path.append(verts[j])
+        prev_j = parent[mask * k + j]
+        mask ^= 1 << j
+        j = int(prev_j)
+    path.append(start)
+    path.reverse()
+    path.append(start)
+    if DEBUG:
+        debug_print(f"ДП Хелда–Карпа: тур {path}")
+    return path, tour_cost(matrix, path)
+
+
+def validate_held_karp(n, trials=5, symmetric=False, seed=0):
+    """
+    Сверяет стоимость тура Хелда–Карпа с МВиГ на случайных матрицах.
+    """
+    for trial in range(trials):
+        random.seed(seed + trial)
+        matrix = generate_matrix(n, symmetric=symmetric)
+        _, cost_dp = tsp_held_karp(matrix)
+        _, cost_bnb = tsp_branch_and_bound(matrix)
+        status = "OK" if cost_dp == cost_bnb else "РАСХОЖДЕНИЕ"
+        print(f"Тест {trial + 1}: n={n}, ДП={cost_dp}, МВиГ={cost_bnb} – {status}")
+        if cost_dp != cost_bnb:
+            return False
+    return True
 
 
 def tour_cost(matrix, tour):
     """
     Вычисляет стоимость данного тура.
     """
+    if is_ndarray(matrix):
+        idx = np.asarray(tour, dtype=np.intp)
+        return matrix[idx[:-1], idx[1:]].sum().item()
     cost = 0
     for i in range(len(tour) - 1):
         cost += matrix[tour[i]][tour[i + 1]]
     return cost
 
 
-def tsp_approx(matrix, start=0):
+def tsp_approx(matrix, start=0, mode="amr", neighbours=8):
     """
     Приближённый алгоритм (АМР).
+    mode="ls" – локальный поиск tsp_local_search (для больших n).
     """
+    if mode == "ls":
+        return tsp_local_search(matrix, start, neighbours)
     n = len(matrix)
     tour = [start] + [i for i in range(n) if i != start] + [start]
     best_cost = tour_cost(matrix, tour)
-    debug_print(f"Первая модификация: {tour} с ценой {best_cost}")
+    if DEBUG:
+        debug_print(f"Первая модификация: {tour} с ценой {best_cost}")
     F = n
     modifications = 0
     improved = True
@@ -209,44 +1398,247 @@ def tsp_approx(matrix, start=0):
                     best_cost = new_cost
                     improved = True
                     modifications += 1
-                    debug_print(f"Найдена улучшенная модификация: {tour} с ценой {best_cost}")
+                    if DEBUG:
+                        debug_print(f"Найдена улучшенная модификация: {tour} с ценой {best_cost}")
                     break
             if improved:
                 break
     return tour, best_cost
 
 
+def nearest_neighbour_tour(matrix, start=0):
+    """
+    Жадный тур «ближайший сосед» (открытый, без возврата в start).
+    """
+    n = len(matrix)
+    visited = [False] * n
+    visited[start] = True
+    tour = [start]
+    for _ in range(n - 1):
+        row = matrix[tour[-1]]
+        nxt = min((v for v in range(n) if not visited[v]), key=lambda v: row[v])
+        visited[nxt] = True
+        tour.append(nxt)
+    return tour
+
+
+class LocalSearch:
+    """
+    Локальный поиск для задачи коммивояжёра с оценкой хода за O(1).
+    Тур хранится списком вершин (start всегда на позиции 0) и массивом позиций;
+    префиксные суммы прямых и обратных дуг дают стоимость разворота отрезка (2-opt)
+    за O(1) и для несимметричной матрицы. Ходы: перенос отрезка из 1..or_max вершин (Or-opt,
+    при длине 1 – перенос вершины) и 2-opt. Кандидаты ограничены k ближайшими соседями,
+    вершины без улучшающих ходов отключаются битами «не смотреть».
+    """
+
+    def __init__(self, matrix, tour, neighbours=8, or_max=3):
+        self.matrix = matrix
+        self.n = len(tour)
+        self.tour = list(tour)
+        self.or_max = or_max
+        k = min(neighbours, self.n - 1)
+        self.neighbours = [heapq.nsmallest(k, (u for u in range(self.n) if u != v), key=matrix[v].__getitem__)
+                           for v in range(self.n)]
+        self._reindex()
+
+    def _reindex(self):
+        matrix, tour, n = self.matrix, self.tour, self.n
+        self.pos = [0] * n
+        for i, v in enumerate(tour):
+            self.pos[v] = i
+        fwd = [0] * (n + 1)
+        bwd = [0] * (n + 1)
+        for i in range(n):
+            a, b = tour[i], tour[(i + 1) % n]
+            fwd[i + 1] = fwd[i] + matrix[a][b]
+            bwd[i + 1] = bwd[i] + matrix[b][a]
+        self.fwd, self.bwd = fwd, bwd
+
+    def cost(self):
+        return self.fwd[self.n]
+
+    def two_opt_delta(self, i, j):
+        """
+        Изменение стоимости при развороте отрезка позиций i+1..j (0 <= i, i + 2 <= j < n).
+        """
+        m, t, n = self.matrix, self.tour, self.n
+        a, b, c, d = t[i], t[i + 1], t[j], t[(j + 1) % n]
+        inner = (self.bwd[j] - self.bwd[i + 1]) - (self.fwd[j] - self.fwd[i + 1])
+        return m[a][c] + m[b][d] - m[a][b] - m[c][d] + inner
+
+    def or_opt_delta(self, i, j, length):
+        """
+        Изменение стоимости при переносе отрезка позиций j..j+length-1 в место после позиции i.
+        """
+        m, t, n = self.matrix, self.tour, self.n
+        a, b = t[i], t[(i + 1) % n]
+        p, c, e, q = t[j - 1], t[j], t[j + length - 1], t[(j + length) % n]
+        return m[p][q] + m[a][c] + m[e][b] - m[p][c] - m[e][q] - m[a][b]
+
+    def _moves(self, a):
+        # Ходы, добавляющие дугу a -> c для ближайших соседей c
+        n, pos = self.n, self.pos
+        i = pos[a]
+        for c in self.neighbours[a]:
+            j = pos[c]
+            lo, hi = (i, j) if i < j else (j, i)
+            if hi - lo >= 2:
+                yield self.two_opt_delta(lo, hi), '2opt', lo, hi
+            for length in range(1, self.or_max + 1):
+                end = j + length - 1
+                if j == 0 or end >= n or j <= i <= end or i == j - 1:
+                    continue
+                yield self.or_opt_delta(i, j, length), 'or', i, (j, length)
+
+    def apply(self, kind, i, arg):
+        t = self.tour
+        if kind == '2opt':
+            t[i + 1:arg + 1] = t[i + 1:arg + 1][::-1]
+            touched = (t[i], t[i + 1], t[arg], t[(arg + 1) % self.n])
+        else:
+            j, length = arg
+            touched = (t[i], t[(i + 1) % self.n], t[j - 1], t[(j + length) % self.n])
+            seg = t[j:j + length]
+            del t[j:j + length]
+            ins = i + 1 if i < j else i + 1 - length
+            t[ins:ins] = seg
+        self._reindex()
+        return touched
+
+    def run(self):
+        """
+        Улучшает тур до локального минимума. Возвращает число применённых ходов.
+        """
+        active = [True] * self.n
+        queue = deque(self.tour)
+        applied = 0
+        while queue:
+            a = queue.popleft()
+            active[a] = False
+            best = min(self._moves(a), default=None, key=lambda mv: mv[0])
+            if best is None or best[0] >= 0:
+                continue
+            delta, kind, i, arg = best
+            touched = self.apply(kind, i, arg)
+            applied += 1
+            if DEBUG:
+                debug_print(f"Ход {kind}: изменение {delta}, стоимость {self.cost()}")
+            for v in touched + (a,):
+                if not active[v]:
+                    active[v] = True
+                    queue.append(v)
+        return applied
+
+
+def tsp_local_search(matrix, start=0, neighbours=8):
+    """
+    Приближённый алгоритм: тур «ближайший сосед» + локальный поиск (Or-opt и 2-opt) с O(1) оценкой ходов.
+    """
+    matrix = to_list(matrix)
+    n = len(matrix)
+    if n <= 2:
+        tour = [start] + [i for i in range(n) if i != start] + [start]
+        return tour, tour_cost(matrix, tour)
+    search = LocalSearch(matrix, nearest_neighbour_tour(matrix, start), neighbours)
+    search.run()
+    tour = search.tour + [start]
+    return tour, search.cost()
+
+
 def main():
     global DEBUG
     parser = argparse.ArgumentParser(description="Решение задачи коммивояжёра методами МВиГ и АМР")
     parser.add_argument("--n", type=int, default=5, help="Количество вершин")
     parser.add_argument("--symmetric", action="store_true", help="Симметричная матрица")
     parser.add_argument("--matrix_file", type=str, help="Файл с матрицей весов")
-    parser.add_argument("--method", type=str, choices=["vig", "amr"], default="vig", help="Метод решения: vig или amr")
+    parser.add_argument("--binary", action="store_true", help="Сохранять last_matrix в двоичном формате")
+    parser.add_argument("--mmap", action="store_true", help="Отображать двоичный файл матрицы в память")
+    parser.add_argument("--method", type=str, choices=["vig", "amr", "dp"], default="vig",
+                        help="Метод решения: vig, amr или dp (Хелд–Карп)")
+    parser.add_argument("--approx_mode", type=str, choices=["amr", "ls"], default="amr",
+                        help="Режим АМР: исходный перебор вставок (amr) или локальный поиск (ls)")
+    parser.add_argument("--float32", action="store_true", help="Хранить таблицу ДП в float32")
+    parser.add_argument("--strategy", type=str, choices=["recursive", "dfs", "best"], default="recursive",
+                        help="Обход дерева МВиГ: рекурсивный, явный стек (dfs) или лучший-первый (best)")
+    parser.add_argument("--node_limit", type=int, help="Ограничение на число раскрытых узлов (dfs/best)")
+    parser.add_argument("--time_limit", type=float, help="Ограничение времени поиска в секундах (dfs/best)")
+    parser.add_argument("--max_open", type=int, help="Максимальный размер очереди для best")
+    parser.add_argument("--warm_start", action="store_true",
+                        help="Начать МВиГ с тура локального поиска в качестве верхней оценки")
+    parser.add_argument("--bound", type=str, choices=["classic", "onetree"], default="classic",
+                        help="Нижняя оценка МВиГ: полусумма и МОД (classic) или с 1-деревом Хелда–Карпа (onetree)")
+    parser.add_argument("--stats", type=str, choices=["json"], help="Вывести статистику поиска МВиГ")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов для МВиГ")
+    parser.add_argument("--backend", type=str, choices=["list", "numpy"], default="list",
+                        help="Представление матрицы: списки Python или массив NumPy")
     parser.add_argument("--debug", action="store_true", help="Включить режим отладки")
+    parser.add_argument("--validate", action="store_true", help="Сверить ДП Хелда–Карпа с МВиГ на случайных матрицах")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Сравнить скорость МВиГ с пересчётом оценки и с инкрементальной оценкой")
     args = parser.parse_args()
 
     DEBUG = args.debug
 
+    if args.backend == "numpy" and np is None:
+        parser.error("для --backend numpy требуется установленный пакет numpy")
+
+    if args.benchmark:
+        benchmark_bounds(args.n, symmetric=args.symmetric)
+        benchmark_warm_start(args.n, symmetric=args.symmetric)
+        benchmark_onetree(args.n)
+        return
+
+    if args.validate:
+        validate_held_karp(args.n, symmetric=args.symmetric)
+        return
+
     if args.matrix_file:
-        matrix = load_matrix(args.matrix_file)
+        matrix = load_matrix(args.matrix_file, backend=args.backend, use_mmap=args.mmap)
     else:
-        matrix = generate_matrix(args.n, symmetric=args.symmetric)
-        save_matrix(matrix, "last_matrix")
+        matrix = generate_matrix(args.n, symmetric=args.symmetric, backend=args.backend)
+        save_matrix(matrix, "last_matrix", binary=args.binary)
 
     print("Матрица весов:")
-    for row in matrix:
-        print(row)
+    for row in to_list(matrix):
+        print(list(row))
 
     start = 0
+    stats = None
+    collect_stats = args.stats is not None
     if args.method == "vig":
-        path, cost = tsp_branch_and_bound(matrix, start)
+        incremental = args.backend == "list"
+        if args.strategy != "recursive":
+            path, cost, info = tsp_search(matrix, start, args.strategy, args.node_limit, args.time_limit,
+                                          args.max_open, incremental, args.warm_start, collect_stats, args.bound)
+            stats = info.get('stats')
+            if not info['complete']:
+                print("\nПоиск остановлен по ограничению, найденный тур может быть неоптимальным")
+        elif args.workers > 1:
+            result = tsp_branch_and_bound_parallel(matrix, start, args.workers, incremental=incremental,
+                                                   warm_start=args.warm_start, collect_stats=collect_stats,
+                                                   bound=args.bound)
+            path, cost = result[:2]
+            stats = result[2] if collect_stats else None
+        else:
+            result = tsp_branch_and_bound(matrix, start, incremental=incremental, warm_start=args.warm_start,
+                                          collect_stats=collect_stats, bound=args.bound)
+            path, cost = result[:2]
+            stats = result[2] if collect_stats else None
         print("\nРешение МВиГ (ветвление + отсечение):")
+    elif args.method == "dp":
+        memory = held_karp_memory(len(matrix), args.float32)
+        print(f"\nОценка пиковой памяти ДП (таблицы и временные массивы): {memory / 2 ** 20:.1f} МБ")
+        path, cost = tsp_held_karp(matrix, start, args.float32)
+        print("\nРешение ДП Хелда–Карпа:")
     else:
-        path, cost = tsp_approx(matrix, start)
+        path, cost = tsp_approx(matrix, start, args.approx_mode)
         print("\nРешение АМР (приближённый метод):")
     print("Путь:", path)
     print("Стоимость:", cost)
+    if stats is not None:
+        print("\nСтатистика поиска:")
+        print(stats.to_json())
 
 
 if __name__ == "__main__":
@@ -1,4 +1,19 @@
+import math
+from array import array
+
+from main import diagonal_band, levenshtein_kernel
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 DEBUG = False
+LINEAR_MEMORY_THRESHOLD = 10 ** 7  # Начиная с этого числа ячеек матрица DP не строится целиком
+COMPACT_TRACE_THRESHOLD = 4 * 10 ** 8  # До этого числа ячеек хранятся 2-битные коды хода, дальше – Хиршберг
+
+# 2-битные коды хода в compute_trace
+TRACE_DIAG, TRACE_INSERT, TRACE_DELETE = 0, 1, 2
 
 
 def print_matrix(matrix, A, B):
@@ -12,7 +27,19 @@ def print_matrix(matrix, A, B):
     print()
 
 
-def compute_dp(price, A, B):
+def compute_dp(price, A, B, max_distance=None, backend="python"):
+    # Матрица целиком нужна для backtrace, поэтому при одинаковых ценах алгоритм Майерса
+    # (main.levenshtein_distance) здесь не подходит – он даёт только расстояние
+    if max_distance is not None:
+        return compute_dp_banded(price, A, B, max_distance)
+    if backend == "numpy":
+        return compute_dp_numpy(price, A, B)
+    if not DEBUG:
+        return levenshtein_kernel(price, A, B)
+    return _compute_dp_traced(price, A, B)
+
+
+def _compute_dp_traced(price, A, B):
     m, n = len(A), len(B)
     matrix = [[0] * (n + 1) for _ in range(m + 1)]
 
@@ -49,8 +76,92 @@ def compute_dp(price, A, B):
     return matrix
 
 
+def _codes(s):
+    return np.frombuffer(s.encode('utf-32-le'), dtype=np.uint32)
+
+
+def compute_dp_numpy(price, A, B):
+    """
+    Матрица DP (массив NumPy int64), построчно векторными операциями.
+    Замена и удаление зависят только от предыдущей строки: tmp[j] = min(prev[j - 1] + замена, prev[j] + удаление).
+    Вставка – зависимость внутри строки: cur[j] = min по l <= j от tmp[l] + (j - l) * insert,
+    то есть накопленный минимум tmp[j] - j * insert плюс j * insert.
+    Значения совпадают с compute_dp, поэтому матрица подходит для backtrace.
+    """
+    if np is None:
+        raise RuntimeError("Для numpy-режима требуется установленный пакет numpy")
+    replace_cost, insert_cost, delete_cost = price
+    m, n = len(A), len(B)
+    a_codes, b_codes = _codes(A), _codes(B)
+    ramp = np.arange(n + 1, dtype=np.int64) * insert_cost
+    dp = np.empty((m + 1, n + 1), dtype=np.int64)
+    dp[0] = ramp
+    tmp = np.empty(n + 1, dtype=np.int64)
+    for i in range(1, m + 1):
+        prev = dp[i - 1]
+        tmp[0] = prev[0] + delete_cost
+        np.add(prev[:-1], (b_codes != a_codes[i - 1]) * replace_cost, out=tmp[1:])
+        np.minimum(tmp[1:], prev[1:] + delete_cost, out=tmp[1:])
+        tmp -= ramp
+        np.minimum.accumulate(tmp, out=dp[i])
+        dp[i] += ramp
+    if DEBUG:
+        print("\nИтоговая матрица DP:")
+        print_matrix(dp, A, B)
+    return dp
+
+
+def compute_dp_banded(price, A, B, max_distance):
+    """
+    Матрица DP, в которой посчитаны только ячейки полосы diagonal_band со значениями не больше
+    max_distance; остальные равны math.inf. Заполнение прекращается, как только вся строка
+    превысила порог. Совместима с backtrace: если расстояние больше порога, backtrace вернёт None.
+    """
+    m, n = len(A), len(B)
+    inf = math.inf
+    matrix = [[inf] * (n + 1) for _ in range(m + 1)]
+    band = diagonal_band(price, m, n, max_distance)
+    if band is None:
+        return matrix
+    d_min, d_max = band
+    for j in range(min(n, d_max) + 1):
+        if j * price[1] <= max_distance:
+            matrix[0][j] = j * price[1]
+
+    for i in range(1, m + 1):
+        prev, row = matrix[i - 1], matrix[i]
+        lo, hi = max(0, i + d_min), min(n, i + d_max)
+        row_min = inf
+        if lo == 0:
+            if i * price[2] <= max_distance:
+                row[0] = row_min = i * price[2]
+            lo = 1
+        for j in range(lo, hi + 1):
+            value = min(prev[j - 1] + (0 if A[i - 1] == B[j - 1] else price[0]),
+                        row[j - 1] + price[1],
+                        prev[j] + price[2])
+            if value <= max_distance:
+                row[j] = value
+                if value < row_min:
+                    row_min = value
+        if row_min > max_distance:
+            if DEBUG:
+                print(f"Строка {i} целиком больше порога {max_distance}, вычисление прекращено")
+            break
+
+    if DEBUG:
+        print("\nМатрица DP в полосе:")
+        print_matrix(matrix, A, B)
+
+    return matrix
+
+
 def backtrace(dp, price, A, B):
     i, j = len(A), len(B)
+    if dp[i][j] == math.inf:
+        if DEBUG:
+            print("\nРасстояние больше порога, операции не восстанавливаются")
+        return None
     ops = []
     if DEBUG:
         print("\nОбратный ход по матрице для восстановления операций:")
@@ -97,13 +208,209 @@ def backtrace(dp, price, A, B):
     return "".join(ops)
 
 
+def compute_trace(price, A, B):
+    """
+    DP с двумя целыми строками и 2-битным кодом хода на ячейку в bytearray (4 ячейки на байт).
+    Код выбирается в том же порядке, что и в backtrace: диагональ (M или R), вставка, удаление.
+    Возвращает (расстояние, коды); ячейка (i, j) хранится под номером i * (len(B) + 1) + j.
+    """
+    replace_cost, insert_cost, delete_cost = price
+    m, n = len(A), len(B)
+    width = n + 1
+    codes = bytearray(((m + 1) * width + 3) // 4)
+    # Первая строка – вставки, первый столбец – удаления
+    for j in range(1, width):
+        codes[j >> 2] |= TRACE_INSERT << ((j & 3) << 1)
+    prev = array('q', [j * insert_cost for j in range(width)])
+    cur = array('q', prev)
+    for i in range(1, m + 1):
+        a = A[i - 1]
+        base = i * width
+        codes[base >> 2] |= TRACE_DELETE << ((base & 3) << 1)
+        diag = prev[0]
+        left = cur[0] = diag + delete_cost
+        for j in range(1, width):
+            up = prev[j]
+            value = diag if a == B[j - 1] else diag + replace_cost
+            code = TRACE_DIAG
+            if left + insert_cost < value:
+                value = left + insert_cost
+                code = TRACE_INSERT
+            if up + delete_cost < value:
+                value = up + delete_cost
+                code = TRACE_DELETE
+            if code:
+                index = base + j
+                codes[index >> 2] |= code << ((index & 3) << 1)
+            cur[j] = left = value
+            diag = up
+        prev, cur = cur, prev
+    if DEBUG:
+        print(f"Коды хода: {len(codes)} байт на {(m + 1) * width} ячеек")
+    return prev[n], codes
+
+
+def trace_runs(codes, A, B):
+    """
+    Обратный ход по кодам compute_trace. Возвращает список пар (операция, длина серии) от начала строк.
+    """
+    width = len(B) + 1
+    i, j = len(A), len(B)
+    runs = []
+    while i > 0 or j > 0:
+        index = i * width + j
+        code = (codes[index >> 2] >> ((index & 3) << 1)) & 3
+        if code == TRACE_DIAG:
+            op = 'M' if A[i - 1] == B[j - 1] else 'R'
+            i -= 1
+            j -= 1
+        elif code == TRACE_INSERT:
+            op = 'I'
+            j -= 1
+        else:
+            op = 'D'
+            i -= 1
+        if runs and runs[-1][0] == op:
+            runs[-1][1] += 1
+        else:
+            runs.append([op, 1])
+    runs.reverse()
+    return [(op, count) for op, count in runs]
+
+
+def cigar(runs):
+    """
+    Запись серий операций в виде CIGAR: '12M1I3M2D' (M – совпадение, R – замена, I – вставка, D – удаление).
+    Принимает список серий или строку операций, как у backtrace.
+    """
+    if isinstance(runs, str):
+        grouped = []
+        for op in runs:
+            if grouped and grouped[-1][0] == op:
+                grouped[-1][1] += 1
+            else:
+                grouped.append([op, 1])
+        runs = grouped
+    return "".join(f"{count}{op}" for op, count in runs)
+
+
+def backtrace_compact(price, A, B):
+    """
+    Расстояние и выравнивание в виде CIGAR без полной матрицы: память – (m + 1)(n + 1) / 4 байт
+    кодов хода и две строки DP. Операции совпадают с backtrace(compute_dp(...)).
+    """
+    distance, codes = compute_trace(price, A, B)
+    return distance, cigar(trace_runs(codes, A, B))
+
+
+def _forward_row(prev, rows, cols, left_cost, up_cost, rep_cost):
+    """
+    Продолжает DP вниз по строкам rows от строки prev (столбцы cols) и возвращает последнюю строку.
+    Память – две строки.
+    """
+    for a in rows:
+        cur = [prev[0] + up_cost]
+        for j, b in enumerate(cols, 1):
+            cost_replace = prev[j - 1] + (0 if a == b else rep_cost)
+            cost_insert = cur[j - 1] + left_cost
+            cost_delete = prev[j] + up_cost
+            cur.append(min(cost_replace, cost_insert, cost_delete))
+        prev = cur
+    return prev
+
+
+def _trace_block(first_row, rows, cols, r0, r1, c_end, costs, left_first):
+    """
+    Обратный ход по блоку строк r0..r1, начиная с (r1, c_end), до первого попадания в строку r0.
+    first_row – значения dp в строке r0. Правила выбора те же, что в backtrace.
+    Возвращает (операции в обратном порядке, столбец попадания в строку r0).
+    """
+    left_cost, up_cost, rep_cost = costs
+    block = [first_row[:c_end + 1]]
+    for i in range(r0 + 1, r1 + 1):
+        block.append(_forward_row(block[-1], rows[i - 1:i], cols[:c_end], left_cost, up_cost, rep_cost))
+    ops = []
+    i, j = r1, c_end
+    while i > r0:
+        row, prev = block[i - r0], block[i - r0 - 1]
+        if j == 0:
+            ops.append('U')
+            i -= 1
+        elif rows[i - 1] == cols[j - 1] and row[j] == prev[j - 1]:
+            ops.append('M')
+            i -= 1
+            j -= 1
+        elif row[j] == prev[j - 1] + rep_cost:
+            ops.append('R')
+            i -= 1
+            j -= 1
+        elif left_first and row[j] == row[j - 1] + left_cost:
+            ops.append('L')
+            j -= 1
+        elif row[j] == prev[j] + up_cost:
+            ops.append('U')
+            i -= 1
+        else:
+            ops.append('L')
+            j -= 1
+    return ops, j
+
+
+def _hirschberg_solve(first_row, rows, cols, r0, r1, c_end, costs, left_first, ops):
+    if r1 - r0 <= 2:
+        block_ops, j = _trace_block(first_row, rows, cols, r0, r1, c_end, costs, left_first)
+        ops.extend(block_ops)
+        return j
+    mid = (r0 + r1) // 2
+    left_cost, up_cost, rep_cost = costs
+    mid_row = _forward_row(first_row[:c_end + 1], rows[r0:mid], cols[:c_end], left_cost, up_cost, rep_cost)
+    # Сначала нижняя половина: она определяет, в каком столбце путь приходит в строку mid
+    j_mid = _hirschberg_solve(mid_row, rows, cols, mid, r1, c_end, costs, left_first, ops)
+    return _hirschberg_solve(first_row, rows, cols, r0, mid, j_mid, costs, left_first, ops)
+
+
+def hirschberg(price, A, B):
+    """
+    Восстановление операций по схеме «разделяй и властвуй» (Хиршберг) без полной матрицы DP.
+    Возвращает ту же строку операций, что backtrace(compute_dp(...)): обратный ход повторяется
+    по тем же правилам, а строки DP пересчитываются по половинам. Строки DP идут вдоль более
+    короткой строки, поэтому память O(min(m, n) * log(max(m, n))), время O(m * n * log(max(m, n))).
+    """
+    transposed = len(B) > len(A)
+    if transposed:
+        # В транспонированной задаче вставка и удаление меняются местами
+        rows, cols = B, A
+        costs = (price[2], price[1], price[0])
+        names = {'M': 'M', 'R': 'R', 'L': 'D', 'U': 'I'}
+    else:
+        rows, cols = A, B
+        costs = (price[1], price[2], price[0])
+        names = {'M': 'M', 'R': 'R', 'L': 'I', 'U': 'D'}
+    first_row = [j * costs[0] for j in range(len(cols) + 1)]
+    ops = []
+    j = _hirschberg_solve(first_row, rows, cols, 0, len(rows), len(cols), costs, not transposed, ops)
+    ops.extend('L' * j)
+    ops.reverse()
+    result = "".join(names[op] for op in ops)
+    if DEBUG:
+        print("\nПоследовательность операций (Хиршберг):", result)
+    return result
+
+
 if __name__ == '__main__':
     price = list(map(int, input().split()))
     A = input().strip()
     B = input().strip()
 
-    dp = compute_dp(price, A, B)
-    ops = backtrace(dp, price, A, B)
+    cells = len(A) * len(B)
+    if cells > COMPACT_TRACE_THRESHOLD:
+        # Для больших строк выравнивание выводится сериями (CIGAR), а не по символу на операцию
+        ops = cigar(hirschberg(price, A, B))
+    elif cells > LINEAR_MEMORY_THRESHOLD:
+        _, ops = backtrace_compact(price, A, B)
+    else:
+        dp = compute_dp(price, A, B, backend="python" if np is None else "numpy")
+        ops = backtrace(dp, price, A, B)
 
     print(ops)
     print(A)
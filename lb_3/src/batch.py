@@ -0,0 +1,207 @@
+import sys
+import mmap
+import struct
+import argparse
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from main import levenshtein_distance, myers_prepare, myers_scan
+
+DEBUG = False
+
+MATRIX_MAGIC = b"EDM1"
+# Заголовок файла матрицы расстояний: сигнатура, n; далее n * n значений int32 по строкам (-1 – больше порога)
+MATRIX_HEADER = struct.Struct("<4s4xQ")
+
+
+class QueryMatcher:
+    """
+    Сравнение одной строки-запроса со многими строками.
+    При одинаковых ценах (в том числе единичных) расстояние считается алгоритмом Майерса,
+    маски символов запроса строятся один раз; иначе – levenshtein_distance.
+    """
+
+    def __init__(self, price, query, max_distance=None):
+        self.price = list(price)
+        self.query = query
+        self.max_distance = max_distance
+        self.uniform = price[0] == price[1] == price[2]
+        self.prepared = myers_prepare(query) if self.uniform else None
+
+    def distance(self, s):
+        if self.uniform:
+            distance = self.price[0] * myers_scan(self.prepared, s)
+            if self.max_distance is not None and distance > self.max_distance:
+                return None
+            return distance
+        return levenshtein_distance(self.price, self.query, s, self.max_distance)
+
+
+_worker_matchers = {}
+
+
+def _init_worker(price, max_distance, queries):
+    _worker_matchers.clear()
+    _worker_matchers.update(price=price, max_distance=max_distance, queries=queries, cache={})
+
+
+def _matcher(query_index):
+    cache = _worker_matchers['cache']
+    matcher = cache.get(query_index)
+    if matcher is None:
+        matcher = QueryMatcher(_worker_matchers['price'], _worker_matchers['queries'][query_index],
+                               _worker_matchers['max_distance'])
+        cache.clear()
+        cache[query_index] = matcher
+    return matcher
+
+
+def _score_chunk(query_index, start, strings):
+    matcher = _matcher(query_index)
+    return query_index, [(start + k, matcher.distance(s)) for k, s in enumerate(strings)]
+
+
+def _chunks(strings, chunk_size):
+    iterator = iter(strings)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _run_tasks(pool, tasks, max_pending):
+    """
+    Отправляет задачи в пул, держа в работе не больше max_pending, и выдаёт результаты по готовности.
+    """
+    pending = set()
+    for task in tasks:
+        pending.add(pool.submit(*task))
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    for future in pending:
+        yield future.result()
+
+
+def one_vs_many(price, query, strings, workers=1, chunk_size=1000, max_distance=None):
+    """
+    Расстояния от query до каждой строки из strings (любой итерируемый объект, читается потоково).
+    Выдаёт пары (индекс, расстояние) по мере готовности; при workers > 1 порядок не гарантируется.
+    Если расстояние больше max_distance, вместо него выдаётся None.
+    """
+    if workers <= 1:
+        matcher = QueryMatcher(price, query, max_distance)
+        for index, s in enumerate(strings):
+            yield index, matcher.distance(s)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(list(price), max_distance, [query])) as pool:
+        tasks = ((_score_chunk, 0, start, chunk) for start, chunk in _chunks(strings, chunk_size))
+        for _, results in _run_tasks(pool, tasks, workers * 4):
+            yield from results
+
+
+def many_vs_many(price, strings, workers=1, chunk_size=1000, max_distance=None):
+    """
+    Попарные расстояния между строками списка strings: выдаёт тройки (i, j, расстояние) по мере готовности.
+    При равных ценах вставки и удаления расстояние симметрично и считается только для i < j.
+    """
+    strings = list(strings)
+    n = len(strings)
+    symmetric = price[1] == price[2]
+    if workers <= 1:
+        for i, query in enumerate(strings):
+            matcher = QueryMatcher(price, query, max_distance)
+            first = i + 1 if symmetric else 0
+            for j in range(first, n):
+                if j != i:
+                    yield i, j, matcher.distance(strings[j])
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(list(price), max_distance, strings)) as pool:
+        def tasks():
+            for i in range(n):
+                first = i + 1 if symmetric else 0
+                for start in range(first, n, chunk_size):
+                    yield _score_chunk, i, start, strings[start:start + chunk_size]
+
+        for i, results in _run_tasks(pool, tasks(), workers * 4):
+            for j, distance in results:
+                if j != i:
+                    yield i, j, distance
+
+
+def write_distance_matrix(filename, n, triples, symmetric=False):
+    """
+    Записывает тройки (i, j, расстояние) в двоичную матрицу n x n (MATRIX_HEADER, затем int32 по строкам).
+    Файл отображается в память, поэтому тройки можно подавать в любом порядке.
+    Для симметричного расстояния значение дублируется в (j, i); None записывается как -1.
+    """
+    size = MATRIX_HEADER.size + 4 * n * n
+    with open(filename, 'w+b') as f:
+        f.truncate(size)
+        f.write(MATRIX_HEADER.pack(MATRIX_MAGIC, n))
+        if n == 0:
+            return
+        with mmap.mmap(f.fileno(), size) as mm:
+            cells = memoryview(mm)[MATRIX_HEADER.size:].cast('i')
+            for i, j, distance in triples:
+                value = -1 if distance is None else distance
+                cells[i * n + j] = value
+                if symmetric:
+                    cells[j * n + i] = value
+            cells.release()
+
+
+def read_lines(filename):
+    with open(filename, 'r') as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def main():
+    global DEBUG
+    parser = argparse.ArgumentParser(description="Пакетный подсчёт редакционных расстояний")
+    parser.add_argument("--price", type=int, nargs=3, default=[1, 1, 1], metavar=("REPLACE", "INSERT", "DELETE"),
+                        help="Цены замены, вставки и удаления")
+    parser.add_argument("--query", type=str, help="Строка-запрос (режим один-ко-многим)")
+    parser.add_argument("--corpus", type=str, required=True, help="Файл со строками, по одной в строке")
+    parser.add_argument("--pairwise", action="store_true", help="Попарные расстояния между строками файла")
+    parser.add_argument("--matrix_out", type=str, help="Записать попарные расстояния в двоичную матрицу")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов")
+    parser.add_argument("--chunk", type=int, default=1000, help="Число строк в одной задаче")
+    parser.add_argument("--max_distance", type=int, help="Порог: большие расстояния выводятся как '>k'")
+    parser.add_argument("--debug", action="store_true", help="Включить режим отладки")
+    args = parser.parse_args()
+
+    DEBUG = args.debug
+    if args.query is None and not args.pairwise:
+        parser.error("нужен --query или --pairwise")
+
+    def show(distance):
+        return f">{args.max_distance}" if distance is None else str(distance)
+
+    if args.pairwise:
+        strings = list(read_lines(args.corpus))
+        triples = many_vs_many(args.price, strings, args.workers, args.chunk, args.max_distance)
+        if args.matrix_out:
+            symmetric = args.price[1] == args.price[2]
+            write_distance_matrix(args.matrix_out, len(strings), triples, symmetric)
+            if DEBUG:
+                print(f"Матрица {len(strings)} x {len(strings)} записана в {args.matrix_out}")
+            return
+        for i, j, distance in triples:
+            print(f"{i}\t{j}\t{show(distance)}")
+        return
+
+    for index, distance in one_vs_many(args.price, args.query, read_lines(args.corpus), args.workers,
+                                       args.chunk, args.max_distance):
+        sys.stdout.write(f"{index}\t{show(distance)}\n")
+
+
+if __name__ == '__main__':
+    main()
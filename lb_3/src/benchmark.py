@@ -0,0 +1,92 @@
+import io
+import random
+import sys
+import time
+from contextlib import redirect_stdout
+
+import main
+import back
+from main import levenshtein_distance
+
+
+def random_string(length, alphabet="ACGT"):
+    return "".join(random.choice(alphabet) for _ in range(length))
+
+
+def bench_unit_cost(lengths=(1000, 3000, 10000, 30000, 100000), dp_max_cells=10 ** 7, seed=0):
+    """
+    Сравнивает бит-параллельный алгоритм Майерса и двухстрочное DP при единичных ценах.
+    DP запускается, только если число ячеек не больше dp_max_cells.
+    """
+    random.seed(seed)
+    price = [1, 1, 1]
+    print(f"{'длина':>8} {'Майерс, с':>12} {'DP, с':>12} {'ускорение':>10}")
+    for length in lengths:
+        s1, s2 = random_string(length), random_string(length)
+        t0 = time.perf_counter()
+        fast = levenshtein_distance(price, s1, s2)
+        fast_time = time.perf_counter() - t0
+        if length * length <= dp_max_cells:
+            t0 = time.perf_counter()
+            slow = levenshtein_distance(price, s1, s2, bit_parallel=False)
+            slow_time = time.perf_counter() - t0
+            if fast != slow:
+                raise RuntimeError(f"Расстояния расходятся: {fast} и {slow}")
+            print(f"{length:>8} {fast_time:>12.3f} {slow_time:>12.3f} {slow_time / fast_time:>10.1f}")
+        else:
+            print(f"{length:>8} {fast_time:>12.3f} {'-':>12} {'-':>10}")
+
+
+def bench_cells_per_second(lengths=(30, 100, 300), lean_lengths=(1000, 2000), price=(1, 2, 3), seed=0):
+    """
+    Число ячеек в секунду для levenshtein: отладочный вариант (DEBUG, вывод в пустой буфер, без
+    DEBUG_VERBOSE) и вариант без отладки. Отладочный запускается только на коротких строках.
+    """
+    random.seed(seed)
+    price = list(price)
+    print(f"{'длина':>8} {'отладка, яч/с':>16} {'без отладки, яч/с':>20}")
+    for length in sorted(set(lengths) | set(lean_lengths)):
+        s1, s2 = random_string(length), random_string(length)
+        cells = length * length
+        traced = "-"
+        if length in lengths:
+            saved = main.DEBUG, main.DEBUG_VERBOSE
+            main.DEBUG, main.DEBUG_VERBOSE = True, False
+            try:
+                t0 = time.perf_counter()
+                with redirect_stdout(io.StringIO()):
+                    main.levenshtein(price, s1, s2)
+                traced = f"{cells / (time.perf_counter() - t0):,.0f}"
+            finally:
+                main.DEBUG, main.DEBUG_VERBOSE = saved
+        t0 = time.perf_counter()
+        main.levenshtein(price, s1, s2)
+        lean = f"{cells / (time.perf_counter() - t0):,.0f}"
+        print(f"{length:>8} {traced:>16} {lean:>20}")
+
+
+def bench_numpy_dp(lengths=(300, 1000, 3000), price=(1, 2, 3), seed=0):
+    """
+    Число ячеек в секунду для compute_dp: построчный Python и векторный NumPy при произвольных ценах.
+    """
+    random.seed(seed)
+    price = list(price)
+    print(f"{'длина':>8} {'Python, яч/с':>16} {'NumPy, яч/с':>16}")
+    for length in lengths:
+        s1, s2 = random_string(length), random_string(length)
+        cells = length * length
+        speeds = []
+        for backend in ("python", "numpy"):
+            t0 = time.perf_counter()
+            back.compute_dp(price, s1, s2, backend=backend)
+            speeds.append(f"{cells / (time.perf_counter() - t0):,.0f}")
+        print(f"{length:>8} {speeds[0]:>16} {speeds[1]:>16}")
+
+
+if __name__ == '__main__':
+    bench_unit_cost(dp_max_cells=int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7)
+    print()
+    bench_cells_per_second()
+    if back.np is not None:
+        print()
+        bench_numpy_dp()
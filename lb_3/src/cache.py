@@ -0,0 +1,107 @@
+from array import array
+from collections import OrderedDict
+
+from main import levenshtein_distance, next_row
+from back import compute_dp
+
+DEBUG = False
+
+
+class DistanceCache:
+    """
+    LRU-кэш перед levenshtein_distance и compute_dp для фиксированных цен.
+    Ключ – пара строк; при переполнении вытесняется давно не использованная запись.
+    Матрицы из matrix() общие для всех вызовов, изменять их нельзя.
+    """
+
+    def __init__(self, price, maxsize=1024):
+        self.price = tuple(price)
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, compute):
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        value = compute()
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            evicted, _ = entries.popitem(last=False)
+            if DEBUG:
+                print(f"Из кэша вытеснена пара {evicted[1]!r}, {evicted[2]!r}")
+        return value
+
+    def distance(self, s1, s2):
+        return self._lookup(('d', s1, s2), lambda: levenshtein_distance(self.price, s1, s2))
+
+    def matrix(self, s1, s2):
+        return self._lookup(('m', s1, s2), lambda: compute_dp(self.price, s1, s2))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+
+class _TrieNode:
+    __slots__ = ("row", "children")
+
+    def __init__(self, row):
+        self.row = row
+        self.children = {}
+
+
+class PrefixRowTrie:
+    """
+    Строки DP для многих s1 против фиксированной s2, сохранённые в боре префиксов s1.
+    Строка i матрицы зависит только от s1[:i], поэтому для новой s1 считаются лишь строки после
+    её самого длинного уже известного префикса (как в extend_levenshtein_first).
+    Сохраняется не больше max_rows строк; после этого новые строки считаются, но в бор не добавляются.
+    """
+
+    def __init__(self, price, s2, max_rows=100000):
+        self.price = tuple(price)
+        self.s2 = s2
+        self.max_rows = max_rows
+        self.root = _TrieNode(array('q', [j * self.price[1] for j in range(len(s2) + 1)]))
+        self.stored_rows = 1
+        self.reused_rows = 0
+        self.computed_rows = 0
+
+    def distance(self, s1):
+        node = self.root
+        depth = 0
+        for ch in s1:
+            child = node.children.get(ch)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        self.reused_rows += depth
+        if DEBUG:
+            print(f"'{s1}': общий префикс длины {depth}, считаем {len(s1) - depth} строк")
+
+        replace_cost, insert_cost, delete_cost = self.price
+        row = node.row
+        for ch in s1[depth:]:
+            row = next_row(row, ch, self.s2, replace_cost, insert_cost, delete_cost)
+            self.computed_rows += 1
+            if node is not None and self.stored_rows < self.max_rows:
+                child = _TrieNode(row)
+                node.children[ch] = child
+                node = child
+                self.stored_rows += 1
+            else:
+                node = None
+        return row[-1]
+
+    def stats(self):
+        return {"stored_rows": self.stored_rows, "reused_rows": self.reused_rows,
+                "computed_rows": self.computed_rows}
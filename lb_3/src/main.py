@@ -1,5 +1,8 @@
+import math
+from array import array
+
 DEBUG = False  # Общий режим отладки
-DEBUG_VERBOSE = True  # Выводить матрицу после каждой итерации
+DEBUG_VERBOSE = True  # Выводить матрицу после каждой итерации (только вместе с DEBUG)
 
 
 def print_matrix(matrix, s1, s2):
@@ -18,6 +21,48 @@ def print_matrix(matrix, s1, s2):
 
 def levenshtein(price, s1, s2):
     # price[0] - replace, price[1] - insert, price[2] - delete
+    # Возвращается вся матрица DP (нужна extend_levenshtein_*), поэтому алгоритм Майерса здесь неприменим;
+    # если нужно только расстояние, используйте levenshtein_distance
+    if DEBUG:
+        return _levenshtein_traced(price, s1, s2)
+    matrix = levenshtein_kernel(price, s1, s2)
+    return matrix[-1][-1], matrix
+
+
+def levenshtein_kernel(price, s1, s2):
+    """
+    Матрица расстояний без отладочного вывода: цены вынесены из цикла,
+    строки матрицы – array('q'), ячейка считается через локальные переменные.
+    """
+    replace_cost, insert_cost, delete_cost = price
+    prev = array('q', [j * insert_cost for j in range(len(s2) + 1)])
+    matrix = [prev]
+    for a in s1:
+        prev = next_row(prev, a, s2, replace_cost, insert_cost, delete_cost)
+        matrix.append(prev)
+    return matrix
+
+
+def next_row(prev, a, s2, replace_cost, insert_cost, delete_cost):
+    """
+    Следующая строка матрицы (символ a первой строки) по предыдущей строке prev.
+    """
+    cur = array('q', prev)
+    diag = prev[0]
+    left = cur[0] = diag + delete_cost
+    for j, b in enumerate(s2, 1):
+        up = prev[j]
+        value = diag if a == b else diag + replace_cost
+        if left + insert_cost < value:
+            value = left + insert_cost
+        if up + delete_cost < value:
+            value = up + delete_cost
+        cur[j] = left = value
+        diag = up
+    return cur
+
+
+def _levenshtein_traced(price, s1, s2):
     m, n = len(s1), len(s2)
     matrix = [[0] * (n + 1) for _ in range(m + 1)]
 
@@ -35,7 +80,7 @@ def levenshtein(price, s1, s2):
         if DEBUG:
             print(f"  Удалить '{s1[i - 1]}' из позиции {i - 1}: {i} * {price[2]} = {matrix[i][0]}")
 
-    if DEBUG_VERBOSE:
+    if DEBUG and DEBUG_VERBOSE:
         print("\nНачальная матрица:")
         print_matrix(matrix, s1, s2)
 
@@ -60,7 +105,7 @@ def levenshtein(price, s1, s2):
                 print(f"  Стоимость удаления : dp[{i - 1}][{j}] + {price[2]} = {cost_delete}")
                 print(f"  --> Выбрано минимальное значение: {matrix[i][j]}")
 
-            if DEBUG_VERBOSE:
+            if DEBUG and DEBUG_VERBOSE:
                 print("\nТекущая матрица:")
                 print_matrix(matrix, s1, s2)
 
@@ -71,12 +116,168 @@ def levenshtein(price, s1, s2):
     return matrix[m][n], matrix
 
 
+def diagonal_band(price, m, n, max_distance):
+    """
+    Полоса диагоналей d = j - i, вне которой любой путь из (0, 0) в (m, n) через ячейку (i, j)
+    дороже max_distance (отступ от диагонали оплачивается вставками или удалениями).
+    Возвращает (d_min, d_max) или None, если расстояние заведомо больше max_distance.
+    """
+    insert_cost, delete_cost = price[1], price[2]
+    diff = n - m
+    floor_cost = diff * insert_cost if diff >= 0 else -diff * delete_cost
+    if floor_cost > max_distance:
+        return None
+    gap_cost = insert_cost + delete_cost
+    if gap_cost == 0:
+        return -m, n
+    d_max = max(0, diff, (max_distance + diff * delete_cost) // gap_cost)
+    d_min = min(0, diff, -((max_distance - diff * insert_cost) // gap_cost))
+    return max(d_min, -m), min(d_max, n)
+
+
+def myers_prepare(pattern):
+    """
+    Предобработка шаблона для myers_scan: битовые маски позиций каждого символа.
+    Не зависит от второй строки, поэтому переиспользуется при сравнении одного шаблона со многими строками.
+    """
+    peq = {}
+    for i, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    return peq, len(pattern)
+
+
+def myers_scan(prepared, text):
+    """
+    Редакционное расстояние (единичные цены) между подготовленным шаблоном и text.
+    """
+    peq, m = prepared
+    if m == 0:
+        return len(text)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv = mask, 0
+    score = m
+    for ch in text:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def myers_distance(s1, s2):
+    """
+    Редакционное расстояние при единичных ценах, бит-параллельный алгоритм Майерса (в форме Хююрё).
+    Столбец DP по более короткой строке хранится как разности соседних ячеек в двух битовых векторах
+    (целые числа Python произвольной длины, т.е. машинные слова обрабатываются блоками на стороне C),
+    на каждый символ другой строки – константное число операций над векторами: O(n * ceil(m / w)).
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    return myers_scan(myers_prepare(s2), s1)
+
+
+def levenshtein_distance(price, s1, s2, max_distance=None, bit_parallel=True):
+    """
+    Редакционное расстояние без матрицы: хранятся только две строки DP.
+    Строки идут вдоль более короткой из s1, s2, поэтому память O(min(len(s1), len(s2))).
+    Если задан max_distance, считаются только ячейки полосы diagonal_band, значения больше
+    порога отбрасываются, а вычисление прекращается, как только вся строка превысила порог;
+    в этом случае возвращается None («больше max_distance»).
+    При одинаковых ценах всех операций (и bit_parallel=True) используется myers_distance.
+    """
+    replace_cost, insert_cost, delete_cost = price
+    if bit_parallel and replace_cost == insert_cost == delete_cost:
+        distance = replace_cost * myers_distance(s1, s2)
+        if max_distance is not None and distance > max_distance:
+            return None
+        return distance
+    if len(s2) > len(s1):
+        # При перестановке строк вставка и удаление меняются местами
+        s1, s2 = s2, s1
+        insert_cost, delete_cost = delete_cost, insert_cost
+    if max_distance is not None:
+        return _banded_distance(replace_cost, insert_cost, delete_cost, s1, s2, max_distance)
+    prev = [j * insert_cost for j in range(len(s2) + 1)]
+    for a in s1:
+        cur = [prev[0] + delete_cost]
+        for j, b in enumerate(s2, 1):
+            cost_replace = prev[j - 1] + (0 if a == b else replace_cost)
+            cost_insert = cur[j - 1] + insert_cost
+            cost_delete = prev[j] + delete_cost
+            cur.append(min(cost_replace, cost_insert, cost_delete))
+        prev = cur
+    return prev[-1]
+
+
+def _banded_distance(replace_cost, insert_cost, delete_cost, s1, s2, max_distance):
+    m, n = len(s1), len(s2)
+    band = diagonal_band((replace_cost, insert_cost, delete_cost), m, n, max_distance)
+    if band is None:
+        return None
+    d_min, d_max = band
+    inf = math.inf
+    prev = [inf] * (n + 2)
+    cur = [inf] * (n + 2)
+    for j in range(min(n, d_max) + 1):
+        value = j * insert_cost
+        prev[j] = value if value <= max_distance else inf
+    for i in range(1, m + 1):
+        lo, hi = max(0, i + d_min), min(n, i + d_max)
+        if lo > hi:
+            return None
+        a = s1[i - 1]
+        row_min = inf
+        if lo == 0:
+            value = prev[0] + delete_cost
+            cur[0] = value if value <= max_distance else inf
+            row_min = cur[0]
+            lo = 1
+        else:
+            cur[lo - 1] = inf
+        for j in range(lo, hi + 1):
+            value = min(prev[j - 1] + (0 if a == s2[j - 1] else replace_cost),
+                        cur[j - 1] + insert_cost,
+                        prev[j] + delete_cost)
+            if value > max_distance:
+                value = inf
+            elif value < row_min:
+                row_min = value
+            cur[j] = value
+        cur[hi + 1] = inf
+        if row_min > max_distance:
+            return None
+        prev, cur = cur, prev
+    result = prev[n]
+    return result if result <= max_distance else None
+
+
 def extend_levenshtein_first(matrix, price, s1, s2, extension):
     """
     Расширение первой строки. Предполагается, что matrix уже содержит матрицу расстояний для старой s1.
     После расширения s1 = s1 + extension, вычисляем только новые строки.
     Временная сложность: O( |extension| * len(s2) )
     """
+    if DEBUG:
+        return _extend_first_traced(matrix, price, s1, s2, extension)
+    replace_cost, insert_cost, delete_cost = price
+    prev = matrix[len(s1)]
+    for a in extension:
+        prev = next_row(prev, a, s2, replace_cost, insert_cost, delete_cost)
+        matrix.append(prev)
+    return prev[len(s2)], s1 + extension
+
+
+def _extend_first_traced(matrix, price, s1, s2, extension):
     old_m = len(s1)
     s1_extended = s1 + extension
     new_m = len(s1_extended)
@@ -122,6 +323,34 @@ def extend_levenshtein_second(matrix, price, s1, s2, extension):
     После расширения s2 = s2 + extension, вычисляем только новые столбцы.
     Временная сложность: O( |extension| * len(s1) )
     """
+    if DEBUG:
+        return _extend_second_traced(matrix, price, s1, s2, extension)
+    replace_cost, insert_cost, delete_cost = price
+    old_n = len(s2)
+    new_n = old_n + len(extension)
+    # Новые столбцы каждой строки считаются отдельным блоком и добавляются одним extend
+    prev_block = [j * insert_cost for j in range(old_n + 1, new_n + 1)]
+    matrix[0].extend(prev_block)
+    for i, a in enumerate(s1, 1):
+        prev, row = matrix[i - 1], matrix[i]
+        diag = prev[old_n]
+        left = row[old_n]
+        block = []
+        for b, up in zip(extension, prev_block):
+            value = diag if a == b else diag + replace_cost
+            if left + insert_cost < value:
+                value = left + insert_cost
+            if up + delete_cost < value:
+                value = up + delete_cost
+            block.append(value)
+            left = value
+            diag = up
+        row.extend(block)
+        prev_block = block
+    return matrix[len(s1)][new_n], s2 + extension
+
+
+def _extend_second_traced(matrix, price, s1, s2, extension):
     old_n = len(s2)
     s2_extended = s2 + extension
     new_n = len(s2_extended)
@@ -162,6 +391,97 @@ def extend_levenshtein_second(matrix, price, s1, s2, extension):
     return matrix[m][new_n], s2_extended
 
 
+class IncrementalLevenshtein:
+    """
+    Редакционное расстояние для строк, которые дописываются посимвольно с любой стороны.
+    Хранится только граница матрицы: последняя строка dp[m][0..n] и последний столбец dp[0..m][n]
+    в массивах array, поэтому добавление символа к s1 стоит O(len(s2)), к s2 – O(len(s1)).
+    Полная матрица сохраняется только при keep_matrix=True (нужна для восстановления операций).
+    """
+
+    def __init__(self, price, s1="", s2="", keep_matrix=False):
+        self.price = tuple(price)
+        self.s1 = []
+        self.s2 = []
+        self.last_row = array('q', [0])
+        self.last_col = array('q', [0])
+        # При сохранении матрицы последняя строка – это её последняя строка, а не копия
+        self.matrix = [self.last_row] if keep_matrix else None
+        self.extend_s1(s1)
+        self.extend_s2(s2)
+
+    @property
+    def distance(self):
+        return self.last_row[-1]
+
+    def append_to_s1(self, ch):
+        replace_cost, insert_cost, delete_cost = self.price
+        prev = self.last_row
+        s2 = self.s2
+        self.s1.append(ch)
+        cur = array('q', prev)
+        left = cur[0] = prev[0] + delete_cost
+        for j in range(1, len(prev)):
+            value = prev[j - 1] if ch == s2[j - 1] else prev[j - 1] + replace_cost
+            if left + insert_cost < value:
+                value = left + insert_cost
+            if prev[j] + delete_cost < value:
+                value = prev[j] + delete_cost
+            cur[j] = left = value
+        self.last_row = cur
+        self.last_col.append(left)
+        if self.matrix is not None:
+            self.matrix.append(cur)
+        if DEBUG:
+            print(f"Добавлен символ '{ch}' к s1: расстояние {left}")
+        return left
+
+    def append_to_s2(self, ch):
+        replace_cost, insert_cost, delete_cost = self.price
+        prev = self.last_col
+        s1 = self.s1
+        self.s2.append(ch)
+        cur = array('q', prev)
+        up = cur[0] = prev[0] + insert_cost
+        matrix = self.matrix
+        if matrix is not None:
+            matrix[0].append(up)
+        for i in range(1, len(prev)):
+            value = prev[i - 1] if ch == s1[i - 1] else prev[i - 1] + replace_cost
+            if prev[i] + insert_cost < value:
+                value = prev[i] + insert_cost
+            if up + delete_cost < value:
+                value = up + delete_cost
+            cur[i] = up = value
+            if matrix is not None:
+                matrix[i].append(value)
+        self.last_col = cur
+        if matrix is None:
+            self.last_row.append(up)
+        if DEBUG:
+            print(f"Добавлен символ '{ch}' к s2: расстояние {up}")
+        return up
+
+    def extend_s1(self, extension):
+        for ch in extension:
+            self.append_to_s1(ch)
+        return self.distance
+
+    def extend_s2(self, extension):
+        for ch in extension:
+            self.append_to_s2(ch)
+        return self.distance
+
+    def operations(self):
+        """
+        Последовательность операций (как в back.backtrace); доступна только при keep_matrix=True.
+        """
+        if self.matrix is None:
+            raise ValueError("Матрица не сохраняется: создайте объект с keep_matrix=True")
+        from back import backtrace
+        return backtrace(self.matrix, self.price, "".join(self.s1), "".join(self.s2))
+
+
 if __name__ == '__main__':
     if not DEBUG:
         DEBUG_VERBOSE = False
@@ -170,7 +490,13 @@ if __name__ == '__main__':
     s1 = input().strip()
     s2 = input().strip()
 
-    dist, matrix = levenshtein(price, s1, s2)
+    matrix = None
+    if not DEBUG and price[0] == price[1] == price[2]:
+        # Для вывода расстояния при одинаковых ценах матрица не нужна: алгоритм Майерса;
+        # матрица строится, только если дальше выбрано расширение строки
+        dist = levenshtein_distance(price, s1, s2)
+    else:
+        dist, matrix = levenshtein(price, s1, s2)
     print(f"\nРедакционное расстояние: {dist}")
 
     print("\nВыберите строку для расширения:")
@@ -179,6 +505,9 @@ if __name__ == '__main__':
     print("0 - не расширять")
     choice = input("Ваш выбор: ").strip()
 
+    if choice in ("1", "2") and matrix is None:
+        _, matrix = levenshtein(price, s1, s2)
+
     if choice == "1":
         extension = input("Введите продолжение первой строки: ")
         new_dist, s1_extended = extend_levenshtein_first(matrix, price, s1, s2, extension)
@@ -0,0 +1,148 @@
+import argparse
+from array import array
+from collections import deque
+
+DEBUG = False
+CHUNK_SIZE = 1 << 16
+
+
+def read_chunks(filename, chunk_size=CHUNK_SIZE):
+    with open(filename, 'r') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def approximate_search(price, pattern, chunks, k):
+    """
+    Приближённый поиск pattern в тексте (алгоритм Селлерса): та же матрица DP, что в levenshtein
+    (строки – символы pattern, столбцы – символы текста), но первая строка нулевая, т.е. совпадение
+    может начинаться в любой позиции текста.
+    Текст подаётся итерируемым объектом кусков (chunks), хранится только текущий столбец: память O(len(pattern)).
+    Выдаёт пары (end, distance) для всех позиций end, в которых заканчивается вхождение text[start:end]
+    с расстоянием не больше k.
+    """
+    replace_cost, insert_cost, delete_cost = price
+    m = len(pattern)
+    col = array('q', [i * delete_cost for i in range(m + 1)])
+    if col[m] <= k:
+        yield 0, col[m]
+    end = 0
+    for chunk in chunks:
+        for c in chunk:
+            end += 1
+            diag = 0
+            up = 0
+            for i in range(1, m + 1):
+                left = col[i]
+                value = diag if pattern[i - 1] == c else diag + replace_cost
+                if left + insert_cost < value:
+                    value = left + insert_cost
+                if up + delete_cost < value:
+                    value = up + delete_cost
+                col[i] = up = value
+                diag = left
+            if col[m] <= k:
+                if DEBUG:
+                    print(f"Вхождение заканчивается в позиции {end}: расстояние {col[m]}")
+                yield end, col[m]
+
+
+def match_alignment(price, pattern, window):
+    """
+    Восстанавливает вхождение pattern, заканчивающееся в конце window.
+    Считает матрицу полуглобального выравнивания и делает обратный ход как back.backtrace
+    (приоритет M, R, I, D) до нулевой строки: столбец, в котором он остановился, – начало вхождения.
+    Возвращает (start, distance, ops), start отсчитывается от начала window.
+    """
+    replace_cost, insert_cost, delete_cost = price
+    m, n = len(pattern), len(window)
+    dp = [array('q', [0] * (n + 1))]
+    for i in range(1, m + 1):
+        a = pattern[i - 1]
+        prev = dp[i - 1]
+        cur = array('q', prev)
+        left = cur[0] = prev[0] + delete_cost
+        for j in range(1, n + 1):
+            value = prev[j - 1] if a == window[j - 1] else prev[j - 1] + replace_cost
+            if left + insert_cost < value:
+                value = left + insert_cost
+            if prev[j] + delete_cost < value:
+                value = prev[j] + delete_cost
+            cur[j] = left = value
+        dp.append(cur)
+
+    i, j = m, n
+    ops = []
+    while i > 0:
+        if j == 0:
+            ops.append('D')
+            i -= 1
+        elif pattern[i - 1] == window[j - 1] and dp[i][j] == dp[i - 1][j - 1]:
+            ops.append('M')
+            i -= 1
+            j -= 1
+        elif dp[i][j] == dp[i - 1][j - 1] + replace_cost:
+            ops.append('R')
+            i -= 1
+            j -= 1
+        elif dp[i][j] == dp[i][j - 1] + insert_cost:
+            ops.append('I')
+            j -= 1
+        else:
+            ops.append('D')
+            i -= 1
+    ops.reverse()
+    return j, dp[m][n], "".join(ops)
+
+
+def search_with_spans(price, pattern, chunks, k):
+    """
+    То же, что approximate_search, но для каждого вхождения выдаёт (start, end, distance, ops).
+    Вхождение с расстоянием не больше k содержит не более len(pattern) + k // insert_cost символов текста,
+    поэтому хранится только окно из стольких последних символов. Нужна положительная цена вставки.
+    """
+    insert_cost = price[1]
+    if insert_cost <= 0:
+        raise ValueError("Для восстановления вхождений цена вставки должна быть положительной")
+    width = len(pattern) + k // insert_cost
+    window = deque(maxlen=width)
+
+    def text_with_window():
+        for chunk in chunks:
+            for c in chunk:
+                window.append(c)
+                yield c
+
+    for end, distance in approximate_search(price, pattern, text_with_window(), k):
+        start, _, ops = match_alignment(price, pattern, "".join(window))
+        yield end - len(window) + start, end, distance, ops
+
+
+def main():
+    global DEBUG
+    parser = argparse.ArgumentParser(description="Приближённый поиск подстроки (алгоритм Селлерса)")
+    parser.add_argument("--price", type=int, nargs=3, default=[1, 1, 1], metavar=("REPLACE", "INSERT", "DELETE"),
+                        help="Цены замены, вставки и удаления")
+    parser.add_argument("--pattern", type=str, required=True, help="Искомая строка")
+    parser.add_argument("--file", type=str, required=True, help="Файл с текстом")
+    parser.add_argument("--k", type=int, required=True, help="Максимальное расстояние")
+    parser.add_argument("--spans", action="store_true", help="Выводить начало вхождения и операции")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Размер читаемого куска текста")
+    parser.add_argument("--debug", action="store_true", help="Включить режим отладки")
+    args = parser.parse_args()
+
+    DEBUG = args.debug
+    chunks = read_chunks(args.file, args.chunk)
+    if args.spans:
+        for start, end, distance, ops in search_with_spans(args.price, args.pattern, chunks, args.k):
+            print(f"{start}\t{end}\t{distance}\t{ops}")
+    else:
+        for end, distance in approximate_search(args.price, args.pattern, chunks, args.k):
+            print(f"{end}\t{distance}")
+
+
+if __name__ == '__main__':
+    main()
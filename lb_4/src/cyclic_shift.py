@@ -97,6 +97,175 @@ def cyclic_shift_check(A, B):
     return result
 
 
+def _rotation_starts(A, B, p):
+    """
+    Все k < len(B), для которых A совпадает с (B + B)[k:k + len(A)]; один проход КМП по виртуальной B + B.
+    """
+    n, m = len(B), len(A)
+    starts = []
+    j = 0
+    for i in range(2 * n - 1):
+        ch = B[i % n]
+        while j > 0 and ch != A[j]:
+            j = p[j - 1]
+        if ch == A[j]:
+            j += 1
+        if j == m:
+            starts.append(i - m + 1)
+            j = p[j - 1]
+    return starts
+
+
+def borders(s, p=None):
+    """
+    Длины всех собственных граней s (префиксов, равных суффиксам) по убыванию: цепочка p[n-1], p[p[n-1]-1], ...
+    """
+    if not s:
+        return []
+    if p is None:
+        p = vector_prefix(s)
+    result = []
+    b = p[-1]
+    while b:
+        result.append(b)
+        b = p[b - 1]
+    return result
+
+
+def minimal_period(s, p=None):
+    """
+    Наименьший период s: s[i] == s[i + period] для всех допустимых i.
+    """
+    if not s:
+        return 0
+    if p is None:
+        p = vector_prefix(s)
+    return len(s) - p[-1]
+
+
+def shift_analysis(A, B):
+    """
+    За один проход: все сдвиги, при которых A и B совпадают (в тех же единицах, что cyclic_shift_check,
+    по возрастанию; cyclic_shift_check возвращает один из них), минимальный период A и её грани.
+    Префиксная функция A строится один раз и используется и для поиска, и для периода.
+    """
+    p = vector_prefix(A)
+    result = {"shifts": [], "period": minimal_period(A, p), "borders": borders(A, p)}
+    if len(A) != len(B):
+        return result
+    n = len(B)
+    if n == 0:
+        result["shifts"] = [0]
+        return result
+    result["shifts"] = sorted((n - k) % n for k in _rotation_starts(A, B, p))
+    if DEBUG:
+        print(f"Сдвиги: {result['shifts']}, период: {result['period']}, грани: {result['borders']}")
+    return result
+
+
+def all_shifts(A, B):
+    return shift_analysis(A, B)["shifts"]
+
+
+def minimal_rotation(s):
+    """
+    Начало лексикографически минимального циклического сдвига s за O(n): два кандидата i и j
+    сравниваются по k символам, при несовпадении проигравший кандидат сдвигается за сравнённый блок.
+    Минимальный сдвиг – s[c:] + s[:c], где c – результат.
+    """
+    n = len(s)
+    i, j, k = 0, 1, 0
+    while i < n and j < n and k < n:
+        a, b = s[(i + k) % n], s[(j + k) % n]
+        if a == b:
+            k += 1
+            continue
+        if a > b:
+            i += k + 1
+        else:
+            j += k + 1
+        if i == j:
+            j += 1
+        k = 0
+    return min(i, j) if n else 0
+
+
+def rotation_period(s):
+    """
+    Наименьший d > 0, при котором сдвиг s на d совпадает с s (делитель len(s)); по vector_prefix.
+    """
+    n = len(s)
+    if n == 0:
+        return 1
+    period = n - vector_prefix(s)[-1]
+    return period if n % period == 0 else n
+
+
+class RotationIndex:
+    """
+    Индекс строк по каноническому (минимальному) циклическому сдвигу.
+    Строки – циклические сдвиги друг друга тогда и только тогда, когда их канонические сдвиги равны,
+    поэтому проверка «является ли строка сдвигом уже известной и на сколько» – один поиск в словаре.
+    Для каждого класса хранится первая добавленная строка (представитель), её начало
+    минимального сдвига и период; сдвиг считается так же, как в cyclic_shift_check.
+    """
+
+    def __init__(self):
+        self.classes = {}  # канонический сдвиг -> [ключ представителя, начало сдвига, период, ключи класса]
+
+    def _canonical(self, s):
+        c = minimal_rotation(s)
+        return s[c:] + s[:c], c
+
+    def add(self, s, key=None):
+        """
+        Добавляет строку (key – её идентификатор, по умолчанию сама строка) и возвращает
+        ключ представителя её класса.
+        """
+        key = s if key is None else key
+        canonical, c = self._canonical(s)
+        entry = self.classes.get(canonical)
+        if entry is None:
+            entry = self.classes[canonical] = [key, c, rotation_period(canonical), []]
+            if DEBUG:
+                print(f"Новый класс сдвигов: '{canonical}' (представитель {key!r})")
+        entry[3].append(key)
+        return entry[0]
+
+    def find(self, A):
+        """
+        Ищет известную строку B, циклическим сдвигом которой является A.
+        Возвращает (ключ представителя B, cyclic_shift_check(A, B)) или None.
+        """
+        canonical, c = self._canonical(A)
+        entry = self.classes.get(canonical)
+        if entry is None:
+            return None
+        key, c_b, period = entry[0], entry[1], entry[2]
+        n = len(A)
+        if n == 0:
+            return key, 0
+        # A – сдвиг B влево на k; наименьшее такое k, как первое вхождение A в B + B
+        k = (c_b - c) % period
+        return key, (n - k) % n
+
+    def groups(self):
+        """
+        Классы строк, являющихся циклическими сдвигами друг друга (списки ключей).
+        """
+        return [entry[3] for entry in self.classes.values()]
+
+
+def group_rotations(strings):
+    """
+    Разбивает strings на классы циклических сдвигов; возвращает списки индексов строк.
+    """
+    index = RotationIndex()
+    for i, s in enumerate(strings):
+        index.add(s, i)
+    return index.groups()
+
+
 if __name__ == "__main__":
     first_str = input()
     second_str = input()
@@ -1,4 +1,16 @@
+import os
+import mmap
+import argparse
+import tempfile
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
 DEBUG = False
+CHUNK_SIZE = 1 << 20  # Размер куска при потоковом чтении текста
+PATTERN_CACHE_SIZE = 64  # Число последних скомпилированных шаблонов в кэше
+PATTERN_CACHE_BYTES = 64 << 20  # Суммарный размер таблиц переходов в кэше
+PARALLEL_CHUNK_SIZE = 1 << 24  # Размер части текста для одного процесса
 
 
 def vector_prefix(s):
@@ -59,9 +71,241 @@ def vector_kmp(sub_str, search_str):
     return matching_indices
 
 
-if __name__ == "__main__":
-    sub_str = input()
-    search_str = input()
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    Куски текста из source: строка или bytes (один кусок), файловый объект или mmap (read по chunk_size),
+    либо любой итерируемый объект кусков.
+    """
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        yield source
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+def kmp_stream(sub_str, source, chunk_size=CHUNK_SIZE, start=0):
+    """
+    Потоковый поиск КМП: префиксная функция строится только для sub_str, текст читается кусками,
+    а состояние автомата (длина совпавшего префикса) переносится через границы кусков.
+    Индексы вхождений выдаются лениво как абсолютные смещения (плюс start). Разделитель не нужен,
+    поэтому текст может содержать любые символы. sub_str и куски должны быть одного типа (str или bytes).
+    """
+    if not sub_str:
+        raise ValueError("Пустая подстрока")
+    p = vector_prefix(sub_str)
+    sub_len = len(sub_str)
+    j = 0
+    offset = start
+    for chunk in iter_chunks(source, chunk_size):
+        for i, c in enumerate(chunk):
+            while j and c != sub_str[j]:
+                j = p[j - 1]
+            if c == sub_str[j]:
+                j += 1
+                if j == sub_len:
+                    if DEBUG:
+                        print(f"Найдено вхождение с индексом {offset + i - sub_len + 1}")
+                    yield offset + i - sub_len + 1
+                    j = p[j - 1]
+        offset += len(chunk)
+
+
+class CompiledPattern:
+    """
+    Автомат КМП для шаблона из байтов: полная таблица переходов по 256 значениям байта
+    (плоский array на 256 * (m + 1) элементов) строится из префиксной функции один раз,
+    после чего поиск – один просмотр таблицы на байт текста без переходов по ссылкам неудачи.
+    В таблице хранится номер следующего состояния, умноженный на 256, чтобы не умножать в цикле.
+    """
+
+    def __init__(self, pattern):
+        if isinstance(pattern, str):
+            pattern = pattern.encode()
+        if not pattern:
+            raise ValueError("Пустая подстрока")
+        self.pattern = bytes(pattern)
+        m = len(self.pattern)
+        p = vector_prefix(self.pattern)
+        table = array('I', bytes(4 * 256 * (m + 1)))
+        table[self.pattern[0]] = 1 << 8
+        for q in range(1, m + 1):
+            fallback = p[q - 1] << 8
+            base = q << 8
+            table[base:base + 256] = table[fallback:fallback + 256]
+            if q < m:
+                table[base + self.pattern[q]] = (q + 1) << 8
+        self.table = table
+        if DEBUG:
+            print(f"Скомпилирован автомат для {self.pattern!r}: {m + 1} состояний")
+
+    def finditer(self, source, chunk_size=CHUNK_SIZE, start=0):
+        """
+        Индексы вхождений (в байтах) в source: bytes, файл, mmap или итерируемый объект кусков bytes.
+        Состояние автомата переносится через границы кусков, индексы выдаются лениво.
+        """
+        table = self.table
+        m = len(self.pattern)
+        final = m << 8
+        state = 0
+        offset = start - m + 1
+        for chunk in iter_chunks(source, chunk_size):
+            for i, b in enumerate(chunk):
+                state = table[state + b]
+                if state == final:
+                    yield offset + i
+            offset += len(chunk)
+
+    def findall(self, source, chunk_size=CHUNK_SIZE):
+        return list(self.finditer(source, chunk_size))
+
+
+class PatternCache:
+    """
+    LRU-кэш скомпилированных шаблонов, ограниченный и числом записей, и суммарным размером таблиц
+    переходов (таблица занимает около 1 КБ на байт шаблона). Шаблон, таблица которого больше
+    max_bytes, компилируется, но в кэш не попадает.
+    """
+
+    def __init__(self, maxsize=PATTERN_CACHE_SIZE, max_bytes=PATTERN_CACHE_BYTES):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pattern):
+        key = pattern.encode() if isinstance(pattern, str) else bytes(pattern)
+        entries = self.entries
+        compiled = entries.get(key)
+        if compiled is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return compiled
+        self.misses += 1
+        compiled = CompiledPattern(key)
+        size = compiled.table.itemsize * len(compiled.table)
+        if size > self.max_bytes:
+            return compiled
+        entries[key] = compiled
+        self.nbytes += size
+        while len(entries) > self.maxsize or self.nbytes > self.max_bytes:
+            _, evicted = entries.popitem(last=False)
+            self.nbytes -= evicted.table.itemsize * len(evicted.table)
+        return compiled
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = self.hits = self.misses = 0
+
+
+_pattern_cache = PatternCache()
+
 
-    res = vector_kmp(sub_str, search_str)
+def compile_pattern(pattern):
+    """
+    Скомпилированный автомат для pattern; недавно использованные шаблоны берутся из кэша (PatternCache).
+    Для разового поиска длинного шаблона лучше создать CompiledPattern напрямую.
+    """
+    return _pattern_cache.get(pattern)
+
+
+_worker_state = {}
+
+
+def _init_worker(filename, pattern):
+    f = open(filename, 'rb')
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _worker_state.update(file=f, mm=mm, view=memoryview(mm), pattern=compile_pattern(pattern))
+
+
+def _search_part(start, end):
+    """
+    Вхождения, начинающиеся в [start, end): просматривается [start, end + m - 1), т.е. с перекрытием
+    в m - 1 байт со следующей частью, чтобы не потерять вхождения на границе.
+    """
+    view = _worker_state['view']
+    compiled = _worker_state['pattern']
+    stop = min(end + len(compiled.pattern) - 1, len(view))
+    return [idx for idx in compiled.finditer(view[start:stop], start=start) if idx < end]
+
+
+def vector_kmp_parallel(sub_str, filename, workers=os.cpu_count(), chunk_size=PARALLEL_CHUNK_SIZE):
+    """
+    Параллельный поиск КМП в файле: файл отображается в память (mmap) в каждом процессе без копирования,
+    делится на части по chunk_size байт с перекрытием len(sub_str) - 1, части обрабатываются в пуле процессов.
+    Каждое вхождение относится к части, в которой оно начинается, поэтому повторов нет;
+    результаты склеиваются в порядке частей. Индексы – в байтах (для ASCII совпадают с vector_kmp).
+    """
+    pattern = sub_str.encode() if isinstance(sub_str, str) else bytes(sub_str)
+    if not pattern:
+        raise ValueError("Пустая подстрока")
+    size = os.path.getsize(filename)
+    if size < len(pattern):
+        return []
+    chunk_size = max(chunk_size, len(pattern))
+    bounds = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+    if DEBUG:
+        print(f"Файл {filename}: {size} байт, {len(bounds)} частей, процессов: {workers}")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(filename, pattern)) as pool:
+        futures = [pool.submit(_search_part, start, end) for start, end in bounds]
+        matching_indices = []
+        for future in futures:
+            matching_indices.extend(future.result())
+    return matching_indices
+
+
+def _automaton_fits(pattern_len, text_len):
+    # Таблица автомата – 256 * (m + 1) элементов; для шаблона, сравнимого с текстом по длине,
+    # её построение дороже самого поиска, и выгоднее обычный проход по ссылкам неудачи
+    return 256 * (pattern_len + 1) <= max(text_len, 1 << 16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поиск подстроки алгоритмом КМП")
+    parser.add_argument("--file", type=str, help="Искать в файле (иначе текст – вторая строка ввода)")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов для параллельного поиска")
+    parser.add_argument("--chunk", type=int, default=PARALLEL_CHUNK_SIZE, help="Размер части текста в байтах")
+    args = parser.parse_args()
+
+    sub_str = input()
+    if not sub_str:
+        # Пустая подстрока: вхождений нет, независимо от режима поиска
+        print(-1)
+        return
+    if args.file is not None:
+        if args.workers > 1:
+            res = vector_kmp_parallel(sub_str, args.file, args.workers, args.chunk)
+        else:
+            pattern = sub_str.encode()
+            with open(args.file, 'rb') as f:
+                if _automaton_fits(len(pattern), os.path.getsize(args.file)):
+                    res = list(compile_pattern(pattern).finditer(f))
+                else:
+                    res = list(kmp_stream(pattern, f))
+    else:
+        search_str = input()
+        if args.workers > 1 and sub_str.isascii() and search_str.isascii():
+            # Текст записывается во временный файл, который процессы отображают в память
+            with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                tmp.write(search_str.encode())
+            try:
+                res = vector_kmp_parallel(sub_str, tmp.name, args.workers, args.chunk)
+            finally:
+                os.remove(tmp.name)
+        elif sub_str.isascii() and search_str.isascii() and _automaton_fits(len(sub_str), len(search_str)):
+            res = compile_pattern(sub_str.encode()).findall(search_str.encode())
+        else:
+            # Не-ASCII текст: индексы в символах, а не в байтах, поэтому поиск по строке
+            res = list(kmp_stream(sub_str, search_str))
     print(','.join(map(str, res)) if res else -1)
+
+
+if __name__ == "__main__":
+    main()